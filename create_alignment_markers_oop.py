@@ -33,13 +33,15 @@ Author: AFRY
 Date: 2025
 """
 import os
+import bisect
 import ifcopenshell
 import math
 import logging
+import numpy as np
 from typing import List, Dict, Tuple, Optional
 from geometry_markers import (
     TriangleMarker, CircleMarker, DirectionalArrow, MarkerElement, 
-    TextAnnotation, generate_ifc_guid
+    TextAnnotation, generate_ifc_guid, get_shared_entity, get_shared_colour
 )
 
 __author__ = 'Eirik Rosbach'
@@ -85,6 +87,19 @@ class StationMarkerFactory:
         >>> triangle = factory.create_triangle_marker(station_value=100.0, placement=...)
     """
     
+    # Property templates in property set order; None entries are filled per marker.
+    # Copying a template keeps the key order without building a new literal each time.
+    _TRIANGLE_PROPERTIES = {
+        "StationValue": None, "MarkerType": "Triangle", "Height": None,
+        "Thickness": None, "Color": "Green"
+    }
+    _CIRCLE_PROPERTIES = {
+        "StationValue": None, "MarkerType": None, "Radius": None,
+        "Thickness": None, "Color": "Red"
+    }
+    
+    __slots__ = ('model', 'owner_history', 'context_3d')
+    
     def __init__(self, model, owner_history, context_3d):
         """
         Initialize the station marker factory.
@@ -126,13 +141,11 @@ class StationMarkerFactory:
         marker_element = MarkerElement(self.model, geometry, self.owner_history, self.context_3d)
         
         # Add property set with marker metadata
-        marker_element.add_properties({
-            "StationValue": station_value,
-            "MarkerType": "Triangle",
-            "Height": height,
-            "Thickness": thickness,
-            "Color": "Green"
-        })
+        properties = self._TRIANGLE_PROPERTIES.copy()
+        properties["StationValue"] = station_value
+        properties["Height"] = height
+        properties["Thickness"] = thickness
+        marker_element.add_properties(properties)
         
         return marker_element
     
@@ -166,13 +179,12 @@ class StationMarkerFactory:
         marker_element = MarkerElement(self.model, geometry, self.owner_history, self.context_3d)
         
         # Add property set with marker metadata
-        marker_element.add_properties({
-            "StationValue": station_value,
-            "MarkerType": f"Circle-{marker_type}",
-            "Radius": radius,
-            "Thickness": thickness,
-            "Color": "Red"
-        })
+        properties = self._CIRCLE_PROPERTIES.copy()
+        properties["StationValue"] = station_value
+        properties["MarkerType"] = f"Circle-{marker_type}"
+        properties["Radius"] = radius
+        properties["Thickness"] = thickness
+        marker_element.add_properties(properties)
         
         return marker_element
 
@@ -181,6 +193,164 @@ class StationMarkerFactory:
 # SLOPE ANALYSIS CLASSES
 # ============================================================================
 
+# Integer codes for IfcAlignmentVerticalSegmentTypeEnum, so the slope calculations
+# can test segment types with array comparisons instead of string equality
+CURVE_OTHER = -1
+CURVE_CONSTANT_GRADIENT = 0
+CURVE_CIRCULAR_ARC = 1
+CURVE_PARABOLIC_ARC = 2
+CURVE_CLOTHOID = 3
+
+_CURVE_TYPE_IDS = {
+    'CONSTANTGRADIENT': CURVE_CONSTANT_GRADIENT,
+    'CIRCULARARC': CURVE_CIRCULAR_ARC,
+    'PARABOLICARC': CURVE_PARABOLIC_ARC,
+    'CLOTHOID': CURVE_CLOTHOID,
+}
+
+
+def curve_type_id(curve_type):
+    """
+    Map a vertical segment type string to its integer code.
+    
+    Accepts the enumeration value with or without the STEP dots
+    ('CONSTANTGRADIENT' or '.CONSTANTGRADIENT.').
+    
+    Args:
+        curve_type (str): Segment type string
+    
+    Returns:
+        int: One of the CURVE_* codes, CURVE_OTHER when unknown
+    """
+    return _CURVE_TYPE_IDS.get(str(curve_type).strip('.'), CURVE_OTHER)
+
+
+class VerticalSegments:
+    """
+    Vertical alignment segments stored as parallel column arrays.
+    
+    Each attribute holds one field for all segments, ordered by start distance, so
+    the slope calculations index plain arrays instead of looking up dictionary keys.
+    The object still behaves as a read-only sequence of segment dictionaries (the
+    format extract_vertical_segments used to return) for code that iterates it.
+    
+    Attributes:
+        start_distance (numpy.ndarray): Segment start stations in meters
+        length (numpy.ndarray): Horizontal segment lengths in meters
+        start_height (numpy.ndarray): Elevations at segment start in meters
+        start_grade (numpy.ndarray): Grades at segment start (decimal)
+        end_grade (numpy.ndarray): Grades at segment end (decimal)
+        radius (numpy.ndarray): Start radius of curvature, NaN where not given
+        curve_type (list): Segment type strings, e.g. 'CONSTANTGRADIENT'
+        curve_type_id (numpy.ndarray): Segment type codes (CURVE_* constants)
+    """
+    
+    # Column order of the rows accepted by from_rows
+    FIELDS = ('start_distance', 'length', 'start_height', 'start_grade', 'end_grade',
+              'curve_type', 'radius')
+    
+    def __init__(self, start_distance, length, start_height, start_grade, end_grade,
+                 curve_type, radius):
+        """
+        Initialize from columns that are already ordered by start distance.
+        
+        Args:
+            start_distance, length, start_height, start_grade, end_grade, radius
+                (sequence of float): One value per segment (radius may contain None)
+            curve_type (sequence of str): One type string per segment
+        """
+        self.start_distance = np.asarray(start_distance, dtype=np.float64)
+        self.length = np.asarray(length, dtype=np.float64)
+        self.start_height = np.asarray(start_height, dtype=np.float64)
+        self.start_grade = np.asarray(start_grade, dtype=np.float64)
+        self.end_grade = np.asarray(end_grade, dtype=np.float64)
+        self.radius = np.array([np.nan if r is None else r for r in radius], dtype=np.float64)
+        self.curve_type = list(curve_type)
+        self.curve_type_id = np.array([curve_type_id(ct) for ct in self.curve_type], dtype=np.int8)
+    
+    @classmethod
+    def from_rows(cls, rows, sort=True):
+        """
+        Build from (start_distance, length, start_height, start_grade, end_grade,
+        curve_type, radius) tuples.
+        
+        Args:
+            rows (iterable): Segment tuples in FIELDS order; consumed once, so a generator works
+            sort (bool, optional): Order segments by start distance (stable). Defaults to True.
+        
+        Returns:
+            VerticalSegments: The column store
+        """
+        rows = list(rows)
+        if not rows:
+            return cls((), (), (), (), (), (), ())
+        segments = cls(*zip(*rows))
+        if sort:
+            # One stable argsort reorders every column; extracted segments are
+            # usually in order already, which needs no reordering at all
+            start = segments.start_distance
+            if np.any(start[1:] < start[:-1]):
+                segments._reorder(np.argsort(start, kind='stable'))
+        return segments
+    
+    def _reorder(self, order):
+        """Reorder all columns in place by the index array order"""
+        self.start_distance = self.start_distance[order]
+        self.length = self.length[order]
+        self.start_height = self.start_height[order]
+        self.start_grade = self.start_grade[order]
+        self.end_grade = self.end_grade[order]
+        self.radius = self.radius[order]
+        self.curve_type = [self.curve_type[i] for i in order.tolist()]
+        self.curve_type_id = self.curve_type_id[order]
+    
+    @classmethod
+    def from_dicts(cls, segments, sort=True):
+        """
+        Build from segment dictionaries keyed by FIELDS ('radius' is optional).
+        
+        Args:
+            segments (iterable): Segment dictionaries
+            sort (bool, optional): Order segments by start distance (stable). Defaults to True.
+        
+        Returns:
+            VerticalSegments: The column store
+        """
+        return cls.from_rows((
+            (s['start_distance'], s['length'], s['start_height'], s['start_grade'],
+             s['end_grade'], s['curve_type'], s.get('radius'))
+            for s in segments
+        ), sort)
+    
+    def __len__(self):
+        return len(self.curve_type)
+    
+    def __getitem__(self, index):
+        """Return segment index as a dictionary"""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("segment index out of range")
+        radius = float(self.radius[index])
+        return {
+            'start_distance': float(self.start_distance[index]),
+            'length': float(self.length[index]),
+            'start_height': float(self.start_height[index]),
+            'start_grade': float(self.start_grade[index]),
+            'end_grade': float(self.end_grade[index]),
+            'curve_type': self.curve_type[index],
+            'radius': None if math.isnan(radius) else radius
+        }
+    
+    def __iter__(self):
+        # Convert each column to Python values once instead of indexing per segment
+        radius = [None if math.isnan(r) else r for r in self.radius.tolist()]
+        for values in zip(self.start_distance.tolist(), self.length.tolist(),
+                          self.start_height.tolist(), self.start_grade.tolist(),
+                          self.end_grade.tolist(), self.curve_type, radius):
+            yield dict(zip(self.FIELDS, values))
+
+
 class SlopeChangeDetector:
     """
     Detects slope change points in vertical alignment segments.
@@ -193,8 +363,10 @@ class SlopeChangeDetector:
     slope values even when referent points don't align exactly with segment boundaries.
     
     Attributes:
-        vertical_segments (list): List of IfcAlignmentVerticalSegment entities
+        vertical_segments (VerticalSegments): Segments ordered by start distance
         grade_change_threshold (float): Minimum grade change to detect (decimal, e.g., 0.01 = 1%)
+        duplicate_tolerance (float): Station distance in meters within which a known
+                                     change duplicates an existing one
         
     Example:
         >>> detector = SlopeChangeDetector(vertical_segments, grade_change_threshold=0.01)
@@ -203,19 +375,64 @@ class SlopeChangeDetector:
         ...     print(f"Grade change at {change['station']}: {change['grade_before']} -> {change['grade_after']}")
     """
     
-    def __init__(self, vertical_segments, grade_change_threshold=0.01):
+    def __init__(self, vertical_segments, grade_change_threshold=0.01, duplicate_tolerance=0.5):
         """
         Initialize slope change detector.
         
         Args:
-            vertical_segments (list): List of IfcAlignmentVerticalSegment entities from the alignment
+            vertical_segments (VerticalSegments or iterable): Segments from extract_vertical_segments,
+                or any iterable (list, generator) of segment dictionaries in the same format
             grade_change_threshold (float): Minimum grade change to detect in decimal form
                                            (e.g., 0.01 represents 1% change)
+            duplicate_tolerance (float, optional): Station distance in meters below which
+                                                   add_known_changes treats a known change as
+                                                   already detected. Defaults to 0.5m.
         """
-        # Sort segments by distance to ensure proper sequential processing
-        self.vertical_segments = sorted(vertical_segments, key=lambda x: x['start_distance'])
+        # Segments ordered by distance to ensure proper sequential processing
+        if not isinstance(vertical_segments, VerticalSegments):
+            vertical_segments = VerticalSegments.from_dicts(vertical_segments)
+        self.vertical_segments = segments = vertical_segments
         self.grade_change_threshold = grade_change_threshold
-        
+        self.duplicate_tolerance = duplicate_tolerance
+        
+        # Column arrays of the sorted segments for the vectorized calculations
+        self._count = len(segments)
+        self._starts = segments.start_distance
+        self._lengths = segments.length
+        self._start_heights = segments.start_height
+        self._start_grades = segments.start_grade
+        self._end_grades = segments.end_grade
+        self._is_constant = segments.curve_type_id == CURVE_CONSTANT_GRADIENT
+        self._end_stations = self._starts + self._lengths
+        # Elevation at each segment end, filled on first use by _segment_end_heights
+        self._end_heights = None
+        # Running maximum of segment end stations: the first index where it reaches a
+        # station is the first segment (in start order) that can contain that station.
+        # Bisecting the start stations instead would pick the last segment starting
+        # before the station, which differs from the first-match rule when segments
+        # overlap (a zero-length segment at a shared boundary, for example).
+        self._reach = np.maximum.accumulate(self._end_stations) if self._count else self._starts
+        self._reach_list = self._reach.tolist()  # bisect on a list beats searchsorted for scalars
+        
+        # The same columns as one tuple per segment for the per-station methods:
+        #   (start_distance, length, start_height, start_grade, end_grade, is_constant)
+        # A single list index and tuple unpack replaces six attribute lookups and
+        # list indexings, and yields Python floats instead of NumPy scalars.
+        self._segment_rows = list(zip(
+            self._starts.tolist(), self._lengths.tolist(), self._start_heights.tolist(),
+            self._start_grades.tolist(), self._end_grades.tolist(), self._is_constant.tolist()
+        ))
+        
+        # End of the last segment, used to extrapolate beyond the alignment end.
+        # Segments never change after construction, so compute it once.
+        if self._count:
+            last_start, last_length, last_height, _, last_end_grade, _ = self._segment_rows[-1]
+            self._tail_station = last_start + last_length
+            self._tail_height = last_height + (last_length * last_end_grade)
+            self._tail_grade = last_end_grade
+        else:
+            self._tail_station = self._tail_height = self._tail_grade = 0.0
+    
     def detect_slope_changes(self):
         """
         Detect all slope change points in the alignment.
@@ -237,40 +454,60 @@ class SlopeChangeDetector:
             - For adjacent segments, check if end grade of previous differs from start grade of current
             - Only records changes exceeding the threshold to filter noise
         """
-        slope_changes = []
+        threshold = self.grade_change_threshold
+        starts = self._starts
+        start_grades = self._start_grades
+        end_grades = self._end_grades
+        
+        # Grade change within segment (parabolic vertical curve), recorded at the
+        # end of the curve; heights for all of them in one vectorized pass
+        curve_idx = np.flatnonzero(np.abs(start_grades - end_grades) > threshold)
+        curves = zip(
+            curve_idx.tolist(), self._end_stations[curve_idx].tolist(), start_grades[curve_idx].tolist(),
+            end_grades[curve_idx].tolist(), self._segment_end_heights()[curve_idx].tolist()
+        )
         
-        for i, segment in enumerate(self.vertical_segments):
-            # Check for grade change within segment (parabolic vertical curve)
-            if abs(segment['start_grade'] - segment['end_grade']) > self.grade_change_threshold:
-                # Slope change at end of curve
-                end_station = segment['start_distance'] + segment['length']
-                end_height = self._calculate_height_at_station(end_station)
-                
-                slope_changes.append({
-                    'station': end_station,
-                    'from_grade': segment['start_grade'],
-                    'to_grade': segment['end_grade'],
-                    'height': end_height,
-                    'type': 'curve'
-                })
-            
-            # Check for grade change between adjacent segments (tangent transitions)
-            if i > 0:
-                prev_segment = self.vertical_segments[i-1]
-                current_start_grade = segment['start_grade']
-                prev_end_grade = prev_segment['end_grade']
-                
-                if abs(current_start_grade - prev_end_grade) > self.grade_change_threshold:
-                    slope_changes.append({
-                        'station': segment['start_distance'],
-                        'from_grade': prev_end_grade,
-                        'to_grade': current_start_grade,
-                        'height': segment['start_height'],
-                        'type': 'transition'
-                    })
+        # Grade change between adjacent segments (tangent transitions), recorded at
+        # the start of the later segment
+        transition_idx = np.flatnonzero(np.abs(start_grades[1:] - end_grades[:-1]) > threshold) + 1
+        transitions = zip(
+            transition_idx.tolist(), starts[transition_idx].tolist(),
+            end_grades[transition_idx - 1].tolist(), start_grades[transition_idx].tolist(),
+            self._start_heights[transition_idx].tolist()
+        )
+        
+        # Only the flagged segments become dictionaries, ordered per segment with
+        # the curve change before the transition into that segment
+        events = [(i, 0, station, from_grade, to_grade, height, 'curve')
+                  for i, station, from_grade, to_grade, height in curves]
+        events.extend((i, 1, station, from_grade, to_grade, height, 'transition')
+                      for i, station, from_grade, to_grade, height in transitions)
+        events.sort(key=lambda event: (event[0], event[1]))
+        
+        slope_changes = [{
+            'station': station,
+            'from_grade': from_grade,
+            'to_grade': to_grade,
+            'height': height,
+            'type': change_type
+        } for _, _, station, from_grade, to_grade, height, change_type in events]
         
         return slope_changes
     
+    def _segment_end_heights(self):
+        """
+        Elevations at every segment end station, computed once per detector.
+        
+        Evaluated with the same rules as _calculate_height_at_station, so where
+        segments overlap the first segment containing the end station is used.
+        
+        Returns:
+            numpy.ndarray: One elevation per segment in start order
+        """
+        if self._end_heights is None:
+            self._end_heights = self._calculate_heights_at_stations(self._end_stations)
+        return self._end_heights
+    
     def add_known_changes(self, slope_changes, known_changes):
         """
         Add known slope changes if not already detected.
@@ -286,19 +523,28 @@ class SlopeChangeDetector:
             list: Combined list with duplicates removed (based on station proximity)
             
         Implementation:
-            - Considers changes at the same station (within 0.01m) as duplicates
+            - Considers changes closer than duplicate_tolerance (0.5m by default) as duplicates
             - Keeps auto-detected version if duplicate found
         """
+        # Stations of all changes so far, kept sorted so the duplicate check only
+        # has to look at the nearest neighbour on either side
+        stations = sorted(change['station'] for change in slope_changes)
+        tolerance = self.duplicate_tolerance
+        
         # Add known changes that aren't already detected
         for known in known_changes:
-            # Check if a change at this station already exists (within 0.5m tolerance)
-            exists = any(
-                abs(existing['station'] - known['station']) < 0.5
-                for existing in slope_changes
+            station = known['station']
+            # Check if a change at this station already exists (within tolerance). The
+            # neighbours are ordered around the station, so no abs() is needed.
+            i = bisect.bisect_left(stations, station)
+            exists = (
+                (i > 0 and station - stations[i - 1] < tolerance) or
+                (i < len(stations) and stations[i] - station < tolerance)
             )
             
             if not exists:
                 slope_changes.append(known)
+                stations.insert(i, station)
         
         # Return sorted by station for consistent ordering
         return sorted(slope_changes, key=lambda x: x['station'])
@@ -317,25 +563,22 @@ class SlopeChangeDetector:
             float: Elevation at the station in meters
             
         Algorithm:
-            - Finds segment containing the station
+            - Finds segment containing the station (binary search, O(log n))
             - For constant gradient: height = start_height + distance * grade
             - For parabolic curves: uses quadratic interpolation between start and end grades
             - Extrapolates beyond last segment using end grade
         """
         # Find the segment containing this station
-        for segment in self.vertical_segments:
-            start_dist = segment['start_distance']
-            length = segment['length']
+        i = bisect.bisect_left(self._reach_list, station)
+        if i < self._count:
+            start_dist, length, start_height, start_grade, end_grade, is_constant = self._segment_rows[i]
             end_dist = start_dist + length
             
             if start_dist <= station <= end_dist:
                 distance_into_segment = station - start_dist
-                start_height = segment['start_height']
-                start_grade = segment['start_grade']
-                end_grade = segment['end_grade']
                 
                 # Linear calculation for constant gradient
-                if segment['curve_type'] == '.CONSTANTGRADIENT.':
+                if is_constant:
                     height = start_height + (distance_into_segment * start_grade)
                 else:
                     # Parabolic interpolation for curved segments
@@ -351,15 +594,164 @@ class SlopeChangeDetector:
                 return height
         
         # Extrapolate from last segment if station is beyond alignment end
-        if self.vertical_segments:
-            last_segment = self.vertical_segments[-1]
-            last_station = last_segment['start_distance'] + last_segment['length']
-            last_height = last_segment['start_height'] + (last_segment['length'] * last_segment['end_grade'])
-            extra_distance = station - last_station
-            return last_height + (extra_distance * last_segment['end_grade'])
+        if self._count:
+            return self._tail_height + ((station - self._tail_station) * self._tail_grade)
         
         return 0.0
 
+    def _calculate_heights_at_stations(self, stations):
+        """
+        Calculate elevations at many stations in one vectorized pass.
+        
+        Array counterpart of _calculate_height_at_station with identical results.
+        
+        Args:
+            stations (sequence of float): Distances along alignment in meters
+        
+        Returns:
+            numpy.ndarray: Elevation at each station in meters (float64)
+        """
+        return self._height_kernel(np.asarray(stations, dtype=np.float64))
+    
+    def _locate_segments(self, stations):
+        """
+        Find the segment containing each station (vectorized).
+        
+        Returns:
+            tuple: (idx, inside) - index of the first segment that can contain each
+                   station, and a mask of stations actually inside that segment
+        """
+        last = self._starts.size - 1
+        idx = np.minimum(np.searchsorted(self._reach, stations, side='left'), last)
+        seg_start = self._starts[idx]
+        inside = (seg_start <= stations) & (stations <= seg_start + self._lengths[idx])
+        return idx, inside
+    
+    def _height_kernel(self, stations):
+        """Vectorized height calculation for an array of stations"""
+        if not self._count:
+            return np.zeros_like(stations)
+        
+        # Locate first segment that can contain each station
+        idx, inside = self._locate_segments(stations)
+        seg_start = self._starts[idx]
+        seg_length = self._lengths[idx]
+        start_height = self._start_heights[idx]
+        start_grade = self._start_grades[idx]
+        
+        # Linear profile for constant gradients
+        dist_into = stations - seg_start
+        heights = start_height + dist_into * start_grade
+        
+        # Average grade method for parabolic curves (zero-length curves keep start height)
+        curved = inside & ~self._is_constant[idx]
+        if curved.any():
+            c_dist = dist_into[curved]
+            c_length = seg_length[curved]
+            c_start_grade = start_grade[curved]
+            t = np.divide(c_dist, c_length, out=np.zeros_like(c_dist), where=c_length > 0)
+            curr_grade = c_start_grade + (self._end_grades[idx][curved] - c_start_grade) * t
+            h_parab = start_height[curved] + (c_dist * (c_start_grade + curr_grade) / 2)
+            heights[curved] = np.where(c_length > 0, h_parab, start_height[curved])
+        
+        # Extrapolate from last segment beyond the alignment end
+        outside = ~inside
+        if outside.any():
+            heights[outside] = self._tail_height + ((stations[outside] - self._tail_station) * self._tail_grade)
+        
+        return heights
+    
+    def _calculate_grade_at_station(self, station):
+        """
+        Calculate the grade at a specific station along the alignment.
+        
+        Args:
+            station (float): Distance along alignment in meters
+        
+        Returns:
+            float: Grade at the station in decimal form
+        
+        Algorithm:
+            - Finds segment containing the station (binary search, O(log n))
+            - For constant gradient: the segment's start grade
+            - For curves: linear interpolation between start and end grades
+            - Uses the last segment's end grade beyond the alignment
+        """
+        i = bisect.bisect_left(self._reach_list, station)
+        if i < self._count:
+            start_dist, length, _, start_grade, end_grade, is_constant = self._segment_rows[i]
+            
+            if start_dist <= station <= start_dist + length:
+                if is_constant:
+                    return start_grade
+                # Interpolate grade for curves
+                if length > 0:
+                    t = (station - start_dist) / length
+                    grade_diff = end_grade - start_grade
+                    return start_grade + (t * grade_diff)
+                return start_grade
+        
+        # Use last segment grade if beyond alignment (0.0 without segments)
+        return self._tail_grade
+    
+    def _calculate_grades_at_stations(self, stations):
+        """
+        Calculate grades at many stations in one vectorized pass.
+        
+        Array counterpart of _calculate_grade_at_station with identical results.
+        
+        Args:
+            stations (sequence of float): Distances along alignment in meters
+        
+        Returns:
+            numpy.ndarray: Grade at each station in decimal form (float64)
+        """
+        return self._grade_kernel(np.asarray(stations, dtype=np.float64))
+    
+    def heights_at(self, stations):
+        """
+        Elevations at an array of stations.
+        
+        Args:
+            stations (sequence of float): Distances along alignment in meters
+        
+        Returns:
+            numpy.ndarray: Elevation at each station in meters (float64)
+        """
+        return self._calculate_heights_at_stations(stations)
+    
+    def grades_at(self, stations):
+        """
+        Grades at an array of stations.
+        
+        Args:
+            stations (sequence of float): Distances along alignment in meters
+        
+        Returns:
+            numpy.ndarray: Grade at each station in decimal form (float64)
+        """
+        return self._calculate_grades_at_stations(stations)
+    
+    def _grade_kernel(self, stations):
+        """Vectorized grade calculation for an array of stations"""
+        grades = np.full_like(stations, self._tail_grade)
+        if not self._count:
+            return grades
+        
+        idx, inside = self._locate_segments(stations)
+        start_grade = self._start_grades[idx]
+        grades[inside] = start_grade[inside]
+        
+        # Interpolate grade within curves (zero-length curves keep the start grade)
+        seg_length = self._lengths[idx]
+        curved = inside & ~self._is_constant[idx] & (seg_length > 0)
+        if curved.any():
+            t = (stations[curved] - self._starts[idx][curved]) / seg_length[curved]
+            grade_diff = self._end_grades[idx][curved] - start_grade[curved]
+            grades[curved] = start_grade[curved] + (t * grade_diff)
+        
+        return grades
+
 
 class SlopeMarkerFactory:
     """
@@ -382,6 +774,25 @@ class SlopeMarkerFactory:
         >>> arrow = factory.create_directional_arrow(station=100.0, grade=0.05, height=10.0, is_upward=True)
     """
     
+    # Property templates in property set order; None entries are filled per marker
+    _SLOPE_CHANGE_PROPERTIES = {
+        "StationNumber": None, "FromGradePercent": None, "ToGradePercent": None,
+        "FromGradeDecimal": None, "ToGradeDecimal": None, "GradeChange": None,
+        "HeightAboveDatum": None, "ChangeType": None, "MarkerColor": "Orange"
+    }
+    _UPWARD_ARROW_PROPERTIES = {
+        "StationNumber": None, "GradePercent": None, "GradeDecimal": None,
+        "HeightAboveDatum": None, "SegmentType": None,
+        "SlopeDirection": "Upward", "ArrowColor": "Green"
+    }
+    _DOWNWARD_ARROW_PROPERTIES = dict(
+        _UPWARD_ARROW_PROPERTIES, SlopeDirection="Downward", ArrowColor="Red"
+    )
+    # Arrow property templates indexed by is_upward
+    _ARROW_PROPERTIES = (_DOWNWARD_ARROW_PROPERTIES, _UPWARD_ARROW_PROPERTIES)
+    
+    __slots__ = ('model', 'owner_history', 'context_3d', '_arrow_geometries')
+    
     def __init__(self, model, owner_history, context_3d):
         """
         Initialize the slope marker factory.
@@ -394,6 +805,9 @@ class SlopeMarkerFactory:
         self.model = model
         self.owner_history = owner_history
         self.context_3d = context_3d
+        # Arrow geometry objects keyed by (length, width, thickness, is_upward); they
+        # hold only their parameters, so markers of one configuration share one
+        self._arrow_geometries = {}
         
     def create_slope_change_marker(self, slope_change, radius=0.4, thickness=0.06,
                                    color=(1.0, 0.5, 0.0), pset_name="Pset_SlopeChange"):
@@ -430,21 +844,23 @@ class SlopeMarkerFactory:
         geometry = CircleMarker(self.model, radius, thickness, color)
         marker_element = MarkerElement(self.model, geometry, self.owner_history, self.context_3d)
         
+        from_grade = slope_change['from_grade']
+        to_grade = slope_change['to_grade']
+        
         # Calculate grade change for property
-        grade_change = slope_change['to_grade'] - slope_change['from_grade']
+        grade_change = to_grade - from_grade
         
         # Add comprehensive slope change properties
-        marker_element.add_properties({
-            "StationNumber": slope_change['station'],
-            "FromGradePercent": slope_change['from_grade'] * 100,
-            "ToGradePercent": slope_change['to_grade'] * 100,
-            "FromGradeDecimal": slope_change['from_grade'],
-            "ToGradeDecimal": slope_change['to_grade'],
-            "GradeChange": grade_change * 100,
-            "HeightAboveDatum": slope_change['height'],
-            "ChangeType": slope_change['type'],
-            "MarkerColor": "Orange"
-        })
+        properties = self._SLOPE_CHANGE_PROPERTIES.copy()
+        properties["StationNumber"] = slope_change['station']
+        properties["FromGradePercent"] = from_grade * 100
+        properties["ToGradePercent"] = to_grade * 100
+        properties["FromGradeDecimal"] = from_grade
+        properties["ToGradeDecimal"] = to_grade
+        properties["GradeChange"] = grade_change * 100
+        properties["HeightAboveDatum"] = slope_change['height']
+        properties["ChangeType"] = slope_change['type']
+        marker_element.add_properties(properties)
         
         return marker_element
     
@@ -485,20 +901,24 @@ class SlopeMarkerFactory:
             The arrow geometry is created pointing in the +X direction. The placement's
             RefDirection should be set to the alignment direction to orient it correctly.
         """
-        # Create arrow geometry with appropriate color
-        geometry = DirectionalArrow(self.model, length, width, thickness, is_upward)
+        # Arrow geometry with appropriate color, reused across arrows of one configuration
+        is_upward = bool(is_upward)
+        key = (length, width, thickness, is_upward)
+        geometry = self._arrow_geometries.get(key)
+        if geometry is None:
+            geometry = self._arrow_geometries[key] = DirectionalArrow(
+                self.model, length, width, thickness, is_upward
+            )
         marker_element = MarkerElement(self.model, geometry, self.owner_history, self.context_3d)
         
         # Add comprehensive slope information properties
-        marker_element.add_properties({
-            "StationNumber": station,
-            "GradePercent": grade * 100,
-            "GradeDecimal": grade,
-            "HeightAboveDatum": height,
-            "SegmentType": segment_type,
-            "SlopeDirection": "Upward" if is_upward else "Downward",
-            "ArrowColor": "Green" if is_upward else "Red"
-        })
+        properties = self._ARROW_PROPERTIES[is_upward].copy()
+        properties["StationNumber"] = station
+        properties["GradePercent"] = grade * 100
+        properties["GradeDecimal"] = grade
+        properties["HeightAboveDatum"] = height
+        properties["SegmentType"] = segment_type
+        marker_element.add_properties(properties)
         
         return marker_element
 
@@ -507,6 +927,45 @@ class SlopeMarkerFactory:
 # SHARED UTILITY CLASSES
 # ============================================================================
 
+def _ref_direction_ratios(placement):
+    """
+    DirectionRatios of a placement's RefDirection, or None if it has no 3D RefDirection.
+    
+    Uses explicit precondition checks rather than try/except: referents commonly
+    leave RefDirection unset, so the "missing" case is a normal path, not an error.
+    """
+    rel_placement = getattr(placement, 'RelativePlacement', None)
+    ref_direction = getattr(rel_placement, 'RefDirection', None)
+    if ref_direction is None:
+        return None
+    ratios = ref_direction.DirectionRatios
+    return ratios if len(ratios) == 3 else None
+
+
+def _normalize3(x, y, z):
+    """Unit vector of (x, y, z), or None if its length is 0.001 or less"""
+    length = math.sqrt(x*x + y*y + z*z)
+    if length > 0.001:
+        inv_length = 1.0 / length
+        return (x*inv_length, y*inv_length, z*inv_length)
+    return None
+
+
+def _perp_xy(x, y, z):
+    """
+    Horizontal unit vector perpendicular to (x, y, z), or None if degenerate.
+    
+    Rotates 90° counterclockwise in the XY plane: (dx, dy) -> (-dy, dx). The
+    tolerance is relative to the full 3D length (|xy| > 0.001 * |xyz|) so
+    near-vertical directions are treated as degenerate.
+    """
+    xy_sq = x*x + y*y
+    if xy_sq > 1e-6 * (xy_sq + z*z):
+        inv_xy_length = 1.0 / math.sqrt(xy_sq)
+        return (-y*inv_xy_length, x*inv_xy_length, 0.0)
+    return None
+
+
 class PlacementCalculator:
     """
     Utility class for calculating spatial placements and orientations.
@@ -521,9 +980,76 @@ class PlacementCalculator:
     These calculations are essential for correctly orienting markers relative to the
     alignment geometry, ensuring markers appear perpendicular or parallel as intended.
     
-    All methods are static as they perform pure geometric calculations without state.
+    All methods are static as they perform pure geometric calculations without state,
+    except for a per-model cache of the constant entities shared by every placement.
     """
     
+    @classmethod
+    def _get_shared_entity(cls, model, key, ifc_class, **attributes):
+        """
+        Return a constant entity for this model, creating it on first use.
+        
+        The cache is the one geometry_markers keeps per model, so the marker
+        solids and the placements share their points and directions.
+        
+        Args:
+            model (ifcopenshell.file): The IFC file
+            key (tuple): Cache key identifying the constant
+            ifc_class (str): IFC class to create on a cache miss
+            **attributes: Attributes for the new entity
+        
+        Returns:
+            entity_instance: The shared entity
+        """
+        return get_shared_entity(model, key, ifc_class, **attributes)
+    
+    @classmethod
+    def _get_direction(cls, model, direction_ratios):
+        """
+        Return the shared IfcDirection for these ratios, interned per model.
+        
+        Ratios are keyed rounded to 6 decimals, so markers along a straight stretch
+        of alignment share one direction entity. The first ratios seen for a key are
+        the ones stored.
+        """
+        x, y, z = direction_ratios
+        return cls._get_shared_entity(
+            model, ('direction', round(x, 6), round(y, 6), round(z, 6)), "IfcDirection",
+            DirectionRatios=(x, y, z)
+        )
+    
+    @classmethod
+    def _get_z_axis(cls, model):
+        """Return the shared vertical IfcDirection (0, 0, 1) for this model."""
+        return cls._get_direction(model, (0.0, 0.0, 1.0))
+    
+    @classmethod
+    def _get_cartesian_point(cls, model, coordinates):
+        """Return the shared IfcCartesianPoint at the given local coordinates for this model."""
+        coordinates = tuple(coordinates)
+        return cls._get_shared_entity(
+            model, ('point', coordinates), "IfcCartesianPoint", Coordinates=coordinates
+        )
+    
+    @classmethod
+    def _get_offset_point(cls, model, height_offset):
+        """Return the shared IfcCartesianPoint (0, 0, height_offset) for this model."""
+        return cls._get_cartesian_point(model, (0.0, 0.0, height_offset))
+    
+    @classmethod
+    def _get_axis_placement(cls, model, location, axis, ref_direction):
+        """
+        Return the shared IfcAxis2Placement3D for these (shared) entities, per model.
+        
+        Marker placements are relative to their referent, so every marker with the
+        same height offset and direction has the same local axis placement; only the
+        IfcLocalPlacement differs per station.
+        """
+        return cls._get_shared_entity(
+            model, ('axis2placement3d', location.id(), axis.id(), ref_direction.id()),
+            "IfcAxis2Placement3D", Location=location, Axis=axis, RefDirection=ref_direction
+        )
+    
     @staticmethod
     def calculate_alignment_direction(placement):
         """
@@ -546,17 +1072,12 @@ class PlacementCalculator:
             - Normalizes to unit vector
             - Returns X-axis default if RefDirection is not defined
         """
-        try:
-            # Navigate to the relative placement from referent
-            rel_placement = placement.RelativePlacement
-            if hasattr(rel_placement, 'RefDirection') and rel_placement.RefDirection:
-                align_dir = rel_placement.RefDirection.DirectionRatios
-                # Normalize to unit vector
-                length = math.sqrt(align_dir[0]**2 + align_dir[1]**2 + align_dir[2]**2)
-                if length > 0.001:
-                    return (align_dir[0]/length, align_dir[1]/length, align_dir[2]/length)
-        except Exception:
-            pass
+        ratios = _ref_direction_ratios(placement)
+        if ratios is not None:
+            # Normalize to unit vector
+            direction = _normalize3(*ratios)
+            if direction is not None:
+                return direction
         
         # Default alignment direction (X-axis)
         return (1.0, 0.0, 0.0)
@@ -583,28 +1104,98 @@ class PlacementCalculator:
             - Normalizes result to unit vector
             - Z-component is always 0 (horizontal perpendicular)
         """
-        try:
-            rel_placement = placement.RelativePlacement
-            if hasattr(rel_placement, 'RefDirection') and rel_placement.RefDirection:
-                align_dir = rel_placement.RefDirection.DirectionRatios
-                # Normalize alignment direction
-                length = math.sqrt(align_dir[0]**2 + align_dir[1]**2 + align_dir[2]**2)
-                align_normalized = (align_dir[0]/length, align_dir[1]/length, align_dir[2]/length)
-                
-                # Calculate perpendicular: rotate 90° counterclockwise in XY plane
-                perp_dir = (-align_normalized[1], align_normalized[0], 0.0)
-                perp_length = math.sqrt(perp_dir[0]**2 + perp_dir[1]**2)
-                
-                if perp_length > 0.001:
-                    return (perp_dir[0]/perp_length, perp_dir[1]/perp_length, 0.0)
-        except Exception:
-            pass
+        ratios = _ref_direction_ratios(placement)
+        if ratios is not None:
+            # Rotate 90° counterclockwise in XY plane and normalize
+            direction = _perp_xy(*ratios)
+            if direction is not None:
+                return direction
         
         # Default perpendicular direction (Y-axis)
         return (0.0, 1.0, 0.0)
     
     @staticmethod
-    def create_marker_placement(model, referent_placement, height_offset=0.5):
+    def calculate_directions(placement):
+        """
+        Calculate alignment and perpendicular directions from one RefDirection read.
+        
+        Equivalent to calling calculate_alignment_direction and
+        calculate_perpendicular_direction, but traverses the placement's attribute
+        chain only once.
+        
+        Args:
+            placement (IfcLinearPlacement): The placement entity with PlacementRelTo referencing alignment
+        
+        Returns:
+            tuple: (alignment_direction, perpendicular_direction) as 3-tuples, with the
+                   same defaults as the single-direction methods
+        """
+        align_dir = perp_dir = None
+        ratios = _ref_direction_ratios(placement)
+        if ratios is not None:
+            align_dir = _normalize3(*ratios)
+            perp_dir = _perp_xy(*ratios)
+        
+        return (align_dir or (1.0, 0.0, 0.0), perp_dir or (0.0, 1.0, 0.0))
+    
+    @staticmethod
+    def compute_directions_batch(placements):
+        """
+        Calculate alignment and perpendicular directions for many placements at once.
+        
+        Vectorized counterpart of calculate_alignment_direction and
+        calculate_perpendicular_direction. The RefDirection ratios are read once per
+        placement into an (N, 3) array and both directions are normalized in a single
+        NumPy pass instead of N separate Python-level normalizations.
+        
+        Args:
+            placements (list): Placement entities (IfcLinearPlacement or IfcLocalPlacement)
+        
+        Returns:
+            tuple: (alignment_directions, perpendicular_directions), two lists of 3-tuples
+                   in the same order as placements. Placements without a usable
+                   RefDirection get the same defaults as the single-placement methods.
+        """
+        count = len(placements)
+        ratios = np.zeros((count, 3), dtype=np.float64)
+        has_direction = np.zeros(count, dtype=bool)
+        
+        for i, placement in enumerate(placements):
+            direction_ratios = _ref_direction_ratios(placement)
+            if direction_ratios is not None:
+                ratios[i] = direction_ratios
+                has_direction[i] = True
+        
+        lengths = np.sqrt(np.einsum('ij,ij->i', ratios, ratios))
+        normalized = np.divide(ratios, lengths[:, None], out=np.zeros_like(ratios),
+                               where=lengths[:, None] > 0.0)
+        
+        # Alignment direction, X-axis default
+        align = np.zeros_like(ratios)
+        align[:, 0] = 1.0
+        valid_align = has_direction & (lengths > 0.001)
+        align[valid_align] = normalized[valid_align]
+        
+        # Perpendicular: rotate 90° counterclockwise in XY plane, Y-axis default.
+        # Computed straight from the raw ratios with one reciprocal square root, the
+        # same operations as _perp_xy, so it needs no second normalization pass.
+        # Its Z is always 0, so only the XY components are computed; the zero is
+        # added back on output because IfcAxis2Placement3D requires a 3D RefDirection.
+        x = ratios[:, 0]
+        y = ratios[:, 1]
+        xy_sq = x*x + y*y
+        valid_perp = has_direction & (xy_sq > 1e-6 * (xy_sq + ratios[:, 2]*ratios[:, 2]))
+        inv_xy_length = np.divide(1.0, np.sqrt(xy_sq), out=np.zeros_like(xy_sq), where=valid_perp)
+        perp_xy = np.empty((count, 2), dtype=np.float64)
+        perp_xy[:, 0] = -y * inv_xy_length
+        perp_xy[:, 1] = x * inv_xy_length
+        perp_xy[~valid_perp] = (0.0, 1.0)
+        
+        return (list(map(tuple, align.tolist())),
+                [(x, y, 0.0) for x, y in perp_xy.tolist()])
+    
+    @staticmethod
+    def create_marker_placement(model, referent_placement, height_offset=0.5, perp_dir=None):
         """
         Create placement for station markers (triangles and circles) perpendicular to alignment.
         
@@ -621,6 +1212,8 @@ class PlacementCalculator:
             model (ifcopenshell.file): The IFC file
             referent_placement (IfcLocalPlacement): Base placement at the station point
             height_offset (float, optional): Vertical offset above alignment in meters. Defaults to 0.5m.
+            perp_dir (tuple, optional): Precomputed perpendicular direction (e.g. from
+                                        compute_directions_batch). Calculated if None.
             
         Returns:
             IfcLocalPlacement: Placement for the marker with perpendicular orientation
@@ -631,33 +1224,26 @@ class PlacementCalculator:
             - Y-axis (RefDirection): Perpendicular to alignment in horizontal plane
             - Z-axis (Axis): Vertical (0, 0, 1)
         """
-        perp_dir = PlacementCalculator.calculate_perpendicular_direction(referent_placement)
+        if perp_dir is None:
+            perp_dir = PlacementCalculator.calculate_perpendicular_direction(referent_placement)
         
         # Position marker vertically above the alignment point
-        offset_point = model.create_entity(
-            "IfcCartesianPoint", 
-            Coordinates=(0.0, 0.0, height_offset)
-        )
+        offset_point = PlacementCalculator._get_offset_point(model, height_offset)
         
         # Orientation: Y-axis perpendicular to alignment, Z-axis up
-        y_direction = model.create_entity("IfcDirection", DirectionRatios=perp_dir)
-        z_direction = model.create_entity("IfcDirection", DirectionRatios=(0.0, 0.0, 1.0))
-        
-        local_axis_placement = model.create_entity(
-            "IfcAxis2Placement3D",
-            Location=offset_point,
-            Axis=z_direction,
-            RefDirection=y_direction
-        )
+        y_direction = PlacementCalculator._get_direction(model, perp_dir)
+        z_direction = PlacementCalculator._get_z_axis(model)
         
-        return model.create_entity(
-            "IfcLocalPlacement",
-            PlacementRelTo=referent_placement,
-            RelativePlacement=local_axis_placement
+        # Shared IfcAxis2Placement3D(Location, Axis, RefDirection)
+        local_axis_placement = PlacementCalculator._get_axis_placement(
+            model, offset_point, z_direction, y_direction
         )
+        
+        # IfcLocalPlacement(PlacementRelTo, RelativePlacement)
+        return model.create_entity("IfcLocalPlacement", referent_placement, local_axis_placement)
     
     @staticmethod
-    def create_arrow_placement(model, referent_placement, height_offset=0.8):
+    def create_arrow_placement(model, referent_placement, height_offset=0.8, align_dir=None):
         """
         Create placement for directional arrows pointing along alignment direction.
         
@@ -674,6 +1260,8 @@ class PlacementCalculator:
             model (ifcopenshell.file): The IFC file
             referent_placement (IfcLocalPlacement): Base placement at the station point
             height_offset (float, optional): Vertical offset above alignment in meters. Defaults to 0.8m.
+            align_dir (tuple, optional): Precomputed alignment direction (e.g. from
+                                         compute_directions_batch). Calculated if None.
             
         Returns:
             IfcLocalPlacement: Placement for the arrow with alignment direction orientation
@@ -689,31 +1277,83 @@ class PlacementCalculator:
             to the alignment direction makes the arrow point correctly along the centerline.
         """
         # Calculate the alignment direction vector
-        align_dir = PlacementCalculator.calculate_alignment_direction(referent_placement)
+        if align_dir is None:
+            align_dir = PlacementCalculator.calculate_alignment_direction(referent_placement)
         
         # Position arrow vertically above the alignment point
-        offset_point = model.create_entity(
-            "IfcCartesianPoint", 
-            Coordinates=(0.0, 0.0, height_offset)
-        )
+        offset_point = PlacementCalculator._get_offset_point(model, height_offset)
         
         # Orientation: X-axis along alignment direction, Z-axis up
         # This makes the arrow point along the alignment with increasing stations
-        x_direction = model.create_entity("IfcDirection", DirectionRatios=align_dir)
-        z_direction = model.create_entity("IfcDirection", DirectionRatios=(0.0, 0.0, 1.0))
-        
-        local_axis_placement = model.create_entity(
-            "IfcAxis2Placement3D",
-            Location=offset_point,
-            Axis=z_direction,
-            RefDirection=x_direction
-        )
+        x_direction = PlacementCalculator._get_direction(model, align_dir)
+        z_direction = PlacementCalculator._get_z_axis(model)
         
-        return model.create_entity(
-            "IfcLocalPlacement",
-            PlacementRelTo=referent_placement,
-            RelativePlacement=local_axis_placement
+        # Shared IfcAxis2Placement3D(Location, Axis, RefDirection)
+        local_axis_placement = PlacementCalculator._get_axis_placement(
+            model, offset_point, z_direction, x_direction
         )
+        
+        # IfcLocalPlacement(PlacementRelTo, RelativePlacement)
+        return model.create_entity("IfcLocalPlacement", referent_placement, local_axis_placement)
+    
+    @staticmethod
+    def create_marker_and_arrow_placements(model, rows, directions=None):
+        """
+        Create marker and arrow placements for many referents in a single pass.
+        
+        Batch counterpart of create_marker_placement and create_arrow_placement. The
+        directions of all referents are extracted once (RefDirection is read a single
+        time per placement) and both placements are emitted in one tight loop, sharing
+        the model's z-axis and offset point entities.
+        
+        Args:
+            model (ifcopenshell.file): The IFC file
+            rows (list): (referent_placement, marker_height, arrow_height) tuples. A
+                         height of None skips that placement for the row.
+            directions (iterable, optional): (align_dir, perp_dir) per row, e.g. from a
+                                             direction cache. Computed with
+                                             compute_directions_batch if None.
+        
+        Returns:
+            tuple: (marker_placements, arrow_placements), two lists parallel to rows
+                   with None where a placement was skipped
+        """
+        if directions is None:
+            align_dirs, perp_dirs = PlacementCalculator.compute_directions_batch(
+                [row[0] for row in rows]
+            )
+            directions = zip(align_dirs, perp_dirs)
+        
+        # IfcLocalPlacement(PlacementRelTo, RelativePlacement) with positional
+        # attributes; the axis placements are shared
+        create = model.create_entity
+        get_axis_placement = PlacementCalculator._get_axis_placement
+        z_direction = PlacementCalculator._get_z_axis(model)
+        marker_placements = []
+        arrow_placements = []
+        
+        for (referent_placement, marker_height, arrow_height), (align_dir, perp_dir) in zip(rows, directions):
+            marker_placement = None
+            if marker_height is not None:
+                marker_placement = create("IfcLocalPlacement", referent_placement, get_axis_placement(
+                    model,
+                    PlacementCalculator._get_offset_point(model, marker_height),
+                    z_direction,
+                    PlacementCalculator._get_direction(model, perp_dir)
+                ))
+            marker_placements.append(marker_placement)
+            
+            arrow_placement = None
+            if arrow_height is not None:
+                arrow_placement = create("IfcLocalPlacement", referent_placement, get_axis_placement(
+                    model,
+                    PlacementCalculator._get_offset_point(model, arrow_height),
+                    z_direction,
+                    PlacementCalculator._get_direction(model, align_dir)
+                ))
+            arrow_placements.append(arrow_placement)
+        
+        return marker_placements, arrow_placements
     
     @staticmethod
     def extract_position(placement):
@@ -730,11 +1370,26 @@ class PlacementCalculator:
             tuple: 3D coordinates (x, y, z) in meters, or (0.0, 0.0, 0.0) if extraction fails
         """
         try:
-            rel_placement = placement.RelativePlacement
-            location = rel_placement.Location.Coordinates
-            return location
+            return PlacementCalculator._extract_position_fast(placement)
         except Exception:
             return (0.0, 0.0, 0.0)
+    
+    @staticmethod
+    def _extract_position_fast(placement):
+        """
+        Extract position coordinates without error handling.
+        
+        For hot paths where the placement is known to have a Cartesian Location
+        (e.g. IfcLocalPlacement with IfcAxis2Placement3D). Raises AttributeError
+        otherwise; use extract_position when the placement may be malformed.
+        
+        Args:
+            placement (IfcLocalPlacement): Placement entity with a Cartesian Location
+        
+        Returns:
+            tuple: Coordinates of the placement's Location
+        """
+        return placement.RelativePlacement.Location.Coordinates
 
 
 class TextLiteralCreator:
@@ -754,6 +1409,10 @@ class TextLiteralCreator:
         >>> text_rep = creator.create_text_literal_representation("Station 100", height=1.0)
     """
     
+    # Constant attribute values of every label, built once instead of per call
+    FONT_FAMILY = ("Arial",)
+    TEXT_PATH = "RIGHT"
+    
     def __init__(self, model, context_3d):
         """
         Initialize text literal creator.
@@ -764,6 +1423,56 @@ class TextLiteralCreator:
         """
         self.model = model
         self.context_3d = context_3d
+        # Shared IfcTextStyle entities keyed by (height, color, weight)
+        self._text_styles = {}
+    
+    def _get_text_style(self, height, color, weight):
+        """
+        Get the IfcTextStyle for a font height, color and weight, creating it once.
+        
+        Labels mostly use a handful of style combinations, so the style entities
+        (colour, font model, text style) are shared by all text literals using them.
+        
+        Args:
+            height (float): Text height in meters
+            color (tuple): RGB color values (0-1 range)
+            weight (str): Font weight, "normal" or "bold"
+        
+        Returns:
+            IfcTextStyle: Shared text style entity
+        """
+        key = (height, tuple(color), weight)
+        ifc_text_style = self._text_styles.get(key)
+        if ifc_text_style is not None:
+            return ifc_text_style
+        
+        text_color_rgb = get_shared_colour(self.model, "TextColor", tuple(color))
+        
+        text_style_char = self.model.create_entity(
+            "IfcTextStyleForDefinedFont",
+            Colour=text_color_rgb,
+            BackgroundColour=None
+        )
+        
+        text_font_style = self.model.create_entity(
+            "IfcTextStyleFontModel",
+            Name="TextFont",
+            FontFamily=self.FONT_FAMILY,
+            FontStyle="normal",
+            FontVariant="normal",
+            FontWeight=weight,
+            FontSize=self.model.create_entity("IfcLengthMeasure", wrappedValue=height)
+        )
+        
+        ifc_text_style = self.model.create_entity(
+            "IfcTextStyle",
+            Name="TextStyle",
+            TextCharacterAppearance=text_style_char,
+            TextFontStyle=text_font_style
+        )
+        
+        self._text_styles[key] = ifc_text_style
+        return ifc_text_style
         
     def create_text_literal_representation(self, text, position_offset=(0.0, 0.2, 0.0),
                                           height=1.0, color=(0.0, 0.0, 0.0), weight="normal"):
@@ -789,17 +1498,17 @@ class TextLiteralCreator:
             - Creates IfcTextLiteralWithExtent with box for text bounds
             - Applies IfcTextStyleFontModel for font properties
             - Applies IfcSurfaceStyleRendering for color
+            - Reuses the text style of earlier labels with the same height, color and weight
+            - Reuses the text placement of earlier labels with the same position offset
             - Returns styled shape representation
         """
         # Create text placement: X-axis to the right, Y-axis forward
-        text_position = self.model.create_entity("IfcCartesianPoint", Coordinates=position_offset)
-        text_axis = self.model.create_entity("IfcDirection", DirectionRatios=(1.0, 0.0, 0.0))
-        text_ref_direction = self.model.create_entity("IfcDirection", DirectionRatios=(0.0, 1.0, 0.0))
-        text_placement = self.model.create_entity(
-            "IfcAxis2Placement3D",
-            Location=text_position,
-            Axis=text_axis,
-            RefDirection=text_ref_direction
+        # Label offsets repeat across markers, so the placement is pooled too
+        text_position = PlacementCalculator._get_cartesian_point(self.model, position_offset)
+        text_axis = PlacementCalculator._get_direction(self.model, (1.0, 0.0, 0.0))
+        text_ref_direction = PlacementCalculator._get_direction(self.model, (0.0, 1.0, 0.0))
+        text_placement = PlacementCalculator._get_axis_placement(
+            self.model, text_position, text_axis, text_ref_direction
         )
         
         # Create text literal
@@ -807,46 +1516,17 @@ class TextLiteralCreator:
             "IfcTextLiteral",
             Literal=text,
             Placement=text_placement,
-            Path="RIGHT"
+            Path=self.TEXT_PATH
         )
         
-        # Create text style
-        text_color_rgb = self.model.create_entity(
-            "IfcColourRgb",
-            Name="TextColor",
-            Red=color[0],
-            Green=color[1],
-            Blue=color[2]
-        )
-        
-        text_style_char = self.model.create_entity(
-            "IfcTextStyleForDefinedFont",
-            Colour=text_color_rgb,
-            BackgroundColour=None
-        )
-        
-        text_font_style = self.model.create_entity(
-            "IfcTextStyleFontModel",
-            Name="TextFont",
-            FontFamily=["Arial"],
-            FontStyle="normal",
-            FontVariant="normal",
-            FontWeight=weight,
-            FontSize=self.model.create_entity("IfcLengthMeasure", wrappedValue=height)
-        )
-        
-        ifc_text_style = self.model.create_entity(
-            "IfcTextStyle",
-            Name="TextStyle",
-            TextCharacterAppearance=text_style_char,
-            TextFontStyle=text_font_style
-        )
+        # Get shared text style
+        ifc_text_style = self._get_text_style(height, color, weight)
         
         # Apply style
         self.model.create_entity(
             "IfcStyledItem",
             Item=text_literal,
-            Styles=[ifc_text_style],
+            Styles=(ifc_text_style,),
             Name="TextStyle"
         )
         
@@ -856,7 +1536,7 @@ class TextLiteralCreator:
             ContextOfItems=self.context_3d,
             RepresentationIdentifier="Annotation",
             RepresentationType="Annotation2D",
-            Items=[text_literal]
+            Items=(text_literal,)
         )
     
     def create_polyline_text_representation(self, text, height=1.0, width_factor=0.6):
@@ -893,12 +1573,96 @@ class TextLiteralCreator:
                 Items=polylines
             )
         return None
+    
+    def create_text_representations(self, text, position_offset=(0.0, 0.2, 0.0), height=1.0,
+                                    color=(0.0, 0.0, 0.0), width_factor=0.6, weight="normal",
+                                    polyline=True):
+        """
+        Create the text literal and its polyline fallback for one label in one call.
+        
+        Both representations of a station label come from the same inputs; the
+        literal reuses the shared text style and the polylines reuse the cached
+        glyph outlines, so neither repeats work done for earlier labels.
+        
+        Args:
+            text (str): Text content to display
+            position_offset (tuple, optional): XYZ offset of the text literal. Defaults to (0.0, 0.2, 0.0).
+            height (float, optional): Text height in meters. Defaults to 1.0m.
+            color (tuple, optional): RGB color of the text literal. Defaults to black.
+            width_factor (float, optional): Width-to-height ratio of the polylines. Defaults to 0.6.
+            weight (str, optional): Font weight of the text literal. Defaults to "normal".
+            polyline (bool, optional): Whether to generate the polyline fallback at all.
+                                      Defaults to True.
+        
+        Returns:
+            tuple: (literal_rep, polyline_rep); polyline_rep is None if the fallback
+            is disabled or no polylines could be generated
+        """
+        literal_rep = self.create_text_literal_representation(
+            text, position_offset, height, color, weight
+        )
+        polyline_rep = None
+        if polyline:
+            polyline_rep = self.create_polyline_text_representation(text, height, width_factor)
+        return literal_rep, polyline_rep
 
 
 # ============================================================================
 # MAIN PROCESSOR CLASS
 # ============================================================================
 
+class MarkerConfig:
+    """
+    Configuration values resolved once from the user configuration dictionary.
+    
+    The processor reads these settings for every station; slot attributes avoid
+    hashing the key strings on each dict lookup. Settings that are absent from the
+    dictionary stay unset and raise AttributeError when read, except for the text
+    settings below, which fall back to their documented defaults.
+    
+    Attributes:
+        One attribute per configuration key, e.g. triangle_height, circle_color,
+        arrow_length, property_set_name.
+    """
+    
+    __slots__ = (
+        'triangle_height', 'triangle_thickness', 'triangle_color',
+        'circle_radius', 'circle_thickness', 'circle_color',
+        'text_height', 'text_width_factor', 'text_color', 'text_position_offset',
+        'polyline_text_fallback', 'separate_polyline_annotation',
+        'text_height_large', 'text_height_medium',
+        'marker_height_offset', 'slope_marker_height_offset', 'arrow_height_offset',
+        'slope_marker_radius', 'slope_marker_thickness', 'slope_marker_color',
+        'arrow_length', 'arrow_width', 'arrow_thickness', 'property_set_name',
+        'grade_change_threshold', 'duplicate_station_tolerance',
+    )
+    
+    # Defaults for settings the processor has always treated as optional
+    DEFAULTS = {
+        'text_color': (0.0, 0.0, 0.0),
+        'text_position_offset': (0.0, 0.2, 0.0),
+        'polyline_text_fallback': True,
+        'separate_polyline_annotation': True,
+        'text_height_large': 0.6,
+        'text_height_medium': 0.5,
+        'grade_change_threshold': 0.01,
+        'duplicate_station_tolerance': 0.5,
+    }
+    
+    def __init__(self, config):
+        """
+        Copy the known settings out of the configuration dictionary.
+        
+        Args:
+            config (dict): Configuration dictionary with user settings
+        """
+        for name in self.__slots__:
+            if name in config:
+                setattr(self, name, config[name])
+            elif name in self.DEFAULTS:
+                setattr(self, name, self.DEFAULTS[name])
+
+
 class AlignmentMarkerProcessor:
     """
     Main orchestrator for creating alignment markers and optional slope analysis.
@@ -935,6 +1699,10 @@ class AlignmentMarkerProcessor:
     DEFAULT_STATION_PSET = "Pset_StationText"
     DEFAULT_SLOPE_PSET = "Pset_SlopeInformation"
     
+    # Maximum elements per IfcRelContainedInSpatialStructure, keeps each
+    # RelatedElements list small enough for streaming readers
+    CONTAINMENT_CHUNK_SIZE = 1000
+    
     def __init__(self, model, config):
         """
         Initialize the alignment marker processor.
@@ -950,24 +1718,42 @@ class AlignmentMarkerProcessor:
         self._validate_config(config)
         self.model = model
         self.config = config
-        self.project = model.by_type("IfcProject")[0]
-        self.owner_history = model.by_type("IfcOwnerHistory")[0]
-        
-        # Get 3D context
-        contexts = model.by_type("IfcGeometricRepresentationContext")
-        self.context_3d = None
-        for context in contexts:
-            if hasattr(context, 'ContextType') and context.ContextType == '3D':
-                self.context_3d = context
-                break
-        if not self.context_3d:
-            self.context_3d = contexts[0] if contexts else None
+        self._cfg = MarkerConfig(config)
+        # by_type results keyed by IFC class, see _by_type
+        self._by_type_cache = {}
+        self.project = self._by_type("IfcProject")[0]
+        self.owner_history = self._by_type("IfcOwnerHistory")[0]
+        
+        # Get 3D context (first 3D context, else the first context of any type)
+        contexts = self._by_type("IfcGeometricRepresentationContext")
+        self.context_3d = next(
+            (context for context in contexts if getattr(context, 'ContextType', None) == '3D'),
+            contexts[0] if contexts else None
+        )
         
         # Initialize helper classes
         self.station_factory = StationMarkerFactory(model, self.owner_history, self.context_3d)
         self.slope_factory = SlopeMarkerFactory(model, self.owner_history, self.context_3d)
         self.text_creator = TextLiteralCreator(model, self.context_3d)
         
+        # (alignment, perpendicular) directions keyed by placement id
+        self._directions = {}
+        # (vertical_segments, SlopeChangeDetector) of the last detector built
+        self._detector = None
+        # Station -> referent mapping and its sorted stations, see referent_map
+        self._referent_map = None
+        self._referent_stations = None
+        # (referents, station values) parsed from referent names, see _station_referents
+        self._parsed_referents = None
+        self._parsed_referents_warned = False
+        # IfcRelNests lists keyed by parent id, built only without IsNestedBy, see _nesting_relationships
+        self._nests_by_parent = None
+    
+    @property
+    def cfg(self):
+        """The validated configuration as a MarkerConfig (attribute access)"""
+        return self._cfg
+    
     def _validate_config(self, config: dict) -> None:
         """Validate configuration parameters"""
         required_keys = [
@@ -988,15 +1774,33 @@ class AlignmentMarkerProcessor:
                 if not all(0.0 <= c <= 1.0 for c in color):
                     raise ValueError(f"{color_key} values must be in range 0.0-1.0")
     
-    def _get_3d_context(self):
-        """Get 3D geometric representation context"""
-        contexts = self.model.by_type("IfcGeometricRepresentationContext")
-        # Find the first 3D geometric context for shape representations
-        for context in contexts:
-            if hasattr(context, 'ContextType') and context.ContextType == '3D':
-                return context
-        # Fallback to first context if no 3D context found
-        return contexts[0] if contexts else None
+    def _by_type(self, ifc_class):
+        """
+        Memoized model.by_type lookup.
+        
+        The processor reads the same entity classes from several methods; each
+        by_type call builds a new result list from the model. Entries must be
+        dropped from the cache when the processor creates entities of that class.
+        """
+        entities = self._by_type_cache.get(ifc_class)
+        if entities is None:
+            entities = self._by_type_cache[ifc_class] = self.model.by_type(ifc_class)
+        return entities
+    
+    def _cache_directions(self, referents):
+        """Compute directions for all referent placements in one batch"""
+        placements = [ref.ObjectPlacement for ref in referents if ref.ObjectPlacement]
+        align_dirs, perp_dirs = PlacementCalculator.compute_directions_batch(placements)
+        for placement, align_dir, perp_dir in zip(placements, align_dirs, perp_dirs):
+            self._directions[placement.id()] = (align_dir, perp_dir)
+    
+    def _placement_directions(self, placement):
+        """Return cached (alignment, perpendicular) directions for a placement"""
+        placement_id = placement.id()
+        directions = self._directions.get(placement_id)
+        if directions is None:
+            directions = self._directions[placement_id] = PlacementCalculator.calculate_directions(placement)
+        return directions
     
     def process_station_markers(self):
         """
@@ -1022,100 +1826,225 @@ class AlignmentMarkerProcessor:
         Text Content Format:
             "Station XXX\\nOffset: YYY m\\nElevation: ZZZ m"
         """
-        referents = self.model.by_type("IfcReferent")
-        logger.info(f"Found {len(referents)} IFCREFERENT objects")
+        logger.info(f"Found {len(self._by_type('IfcReferent'))} IFCREFERENT objects")
+        
+        # Parse each station value once: (referent, station value) pairs
+        parsed, station_values = self._station_referents(warn=True)
+        parsed_referents = list(zip(parsed, station_values.tolist()))
         
         # Determine start and end stations by finding min/max station values
-        station_values = []
-        for ref in referents:
-            if ref.Name:
-                try:
-                    station_values.append(float(ref.Name))
-                except Exception:
-                    pass
+        min_station = float(station_values.min()) if station_values.size else None
+        max_station = float(station_values.max()) if station_values.size else None
         
-        min_station = min(station_values) if station_values else None
-        max_station = max(station_values) if station_values else None
+        # Normalize all referent directions up front in one vectorized pass
+        self._cache_directions(parsed)
         
         created_elements = []
+        circle_count = 0
+        triangle_count = 0
+        
+        # Describe every marker first; this pass is pure Python data and keeps the
+        # model-writing loop below free of per-station decisions
+        specs = [
+            (referent, station_value) + self._station_marker_spec(station_value, min_station, max_station)
+            for referent, station_value in parsed_referents
+        ]
+        
+        # All marker placements in one pass over the precomputed directions; the
+        # offset point, z-axis and axis placements are shared model entities
+        marker_height = self._cfg.marker_height_offset
+        placed = [referent for referent, _ in parsed_referents if referent.ObjectPlacement]
+        placements, _ = PlacementCalculator.create_marker_and_arrow_placements(
+            self.model,
+            [(referent.ObjectPlacement, marker_height, None) for referent in placed],
+            [self._placement_directions(referent.ObjectPlacement) for referent in placed]
+        )
+        placement_by_referent = dict(zip(placed, placements))
         
         # Process each referent point to create markers
-        for referent in referents:
+        emitters = self._station_emitters()
+        process_single_referent = self._process_single_referent
+        for referent, station_value, display_text, marker_type in specs:
             try:
-                elements = self._process_single_referent(
-                    referent, min_station, max_station
+                elements = process_single_referent(
+                    referent, station_value, display_text, marker_type, emitters,
+                    placement_by_referent.get(referent)
                 )
                 created_elements.extend(elements)
+                if elements:
+                    if marker_type == "circle":
+                        circle_count += 1
+                    else:
+                        triangle_count += 1
             except Exception as e:
                 logger.warning(f"Skipping referent without placement")
                 continue
         
+        logger.info(
+            f"Processed {circle_count + triangle_count} station markers "
+            f"({circle_count} circles, {triangle_count} triangles)"
+        )
+        
         return created_elements
     
-    def _process_single_referent(self, referent, min_station, max_station):
-        """Process a single referent and create marker elements"""
+    def _station_referents(self, warn=False):
+        """
+        Parsed station values of all referents in the model, cached per processor.
+        
+        process_station_markers and referent_map share one parse. A parse that
+        skipped referents without warning is repeated with warnings when a caller
+        asks for them.
+        
+        Args:
+            warn (bool, optional): Log a message for every skipped referent. Defaults to False.
+        
+        Returns:
+            tuple: (parsed referents, float64 array of their station values)
+        """
+        referents = self._by_type("IfcReferent")
+        parsed = self._parsed_referents
+        if parsed is None or (warn and not self._parsed_referents_warned and len(parsed[0]) < len(referents)):
+            parsed = self._parsed_referents = self._parse_referent_stations(referents, warn)
+            self._parsed_referents_warned = warn
+        return parsed
+    
+    def _parse_referent_stations(self, referents, warn=False):
+        """
+        Parse the station values stored in referent names.
+        
+        All names are converted in one NumPy pass; only when some name is missing or
+        not numeric does it fall back to parsing referent by referent, skipping (and
+        optionally logging) the ones that fail.
+        
+        Args:
+            referents (list): IfcReferent entities
+            warn (bool, optional): Log a message for every skipped referent. Defaults to False.
+        
+        Returns:
+            tuple: (parsed referents, float64 array of their station values)
+        """
         try:
-            if not referent.Name:
-                logger.warning(f"Skipping referent without name")
-                return []
-            
-            station_value = float(referent.Name)
-        except ValueError:
-            logger.warning(f"Cannot parse station value from '{referent.Name}', skipping")
-            return []
-        except Exception as e:
-            logger.error(f"Error processing referent {referent.Name}: {str(e)}")
-            return []
+            return list(referents), np.array(
+                [ref.Name for ref in referents], dtype=object
+            ).astype(np.float64)
+        except (TypeError, ValueError):
+            pass
         
-        display_text = str(int(station_value)) if station_value.is_integer() else f"{station_value:.1f}"
+        parsed = []
+        values = []
+        for ref in referents:
+            if not ref.Name:
+                if warn:
+                    logger.warning(f"Skipping referent without name")
+                continue
+            try:
+                values.append(float(ref.Name))
+                parsed.append(ref)
+            except ValueError:
+                if warn:
+                    logger.warning(f"Cannot parse station value from '{ref.Name}', skipping")
+            except Exception as e:
+                if warn:
+                    logger.error(f"Error processing referent {ref.Name}: {str(e)}")
+        return parsed, np.array(values, dtype=np.float64)
+    
+    def _station_emitters(self):
+        """
+        Bind what _process_single_referent needs for writing entities to locals.
+        
+        Returns:
+            tuple: (model, owner_history, config)
+        """
+        return self.model, self.owner_history, self._cfg
+    
+    @staticmethod
+    def _station_marker_spec(station_value, min_station, max_station):
+        """
+        Describe the marker for a station without touching the IFC model.
+        
+        Args:
+            station_value (float): Parsed station value
+            min_station (float): Start station of the alignment
+            max_station (float): End station of the alignment
         
+        Returns:
+            tuple: (display_text, marker_type) with marker_type "circle" for the start
+            and end stations and "triangle" otherwise
+        """
+        display_text = str(int(station_value)) if station_value.is_integer() else f"{station_value:.1f}"
         is_start_or_end = (station_value == min_station or station_value == max_station)
-        marker_type = "circle" if is_start_or_end else "triangle"
+        return display_text, "circle" if is_start_or_end else "triangle"
+    
+    def _process_single_referent(self, referent, station_value, display_text, marker_type,
+                                 emitters=None, placement=None):
+        """
+        Create the marker elements for one referent from its marker spec.
         
-        logger.info(f"Processing station: {referent.Name} -> creating {marker_type} with text '{display_text}'")
+        Args:
+            referent (IfcReferent): The station referent
+            station_value (float): Parsed station value
+            display_text (str): Station label, see _station_marker_spec
+            marker_type (str): "circle" or "triangle", see _station_marker_spec
+            emitters (tuple, optional): Result of _station_emitters, resolved once by the
+                caller for a whole batch of referents. Resolved here when omitted.
+            placement (IfcLocalPlacement, optional): Marker placement created by the caller
+                in a batch. Created here when omitted.
+        
+        Returns:
+            list: The marker element followed by its optional polyline text annotation
+        """
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug(f"Processing station: {referent.Name} -> creating {marker_type} with text '{display_text}'")
+        model, owner_history, cfg = emitters or self._station_emitters()
         
         if not referent.ObjectPlacement:
             logger.warning(f"Skipping referent without placement")
             return []
         
         # Create placement
-        placement = PlacementCalculator.create_marker_placement(
-            self.model,
-            referent.ObjectPlacement,
-            self.config['marker_height_offset']
-        )
+        if placement is None:
+            _, perp_dir = self._placement_directions(referent.ObjectPlacement)
+            placement = PlacementCalculator.create_marker_placement(
+                model,
+                referent.ObjectPlacement,
+                cfg.marker_height_offset,
+                perp_dir
+            )
         
         # Create marker element
-        if is_start_or_end:
+        if marker_type == "circle":
             marker_element = self.station_factory.create_circle_marker(
                 station_value,
                 placement,
-                self.config['circle_radius'],
-                self.config['circle_thickness'],
-                self.config['circle_color']
+                cfg.circle_radius,
+                cfg.circle_thickness,
+                cfg.circle_color
             )
         else:
             marker_element = self.station_factory.create_triangle_marker(
                 station_value,
                 placement,
-                self.config['triangle_height'],
-                self.config['triangle_thickness'],
-                self.config['triangle_color']
+                cfg.triangle_height,
+                cfg.triangle_thickness,
+                cfg.triangle_color
             )
         
         # Add additional properties
-        marker_element.add_properties({
-            "DisplayText": display_text,
-            "StationName": referent.Name,
-            "TextHeight": self.config['text_height']
-        })
-        
-        # Create text representations
-        text_literal_rep = self.text_creator.create_text_literal_representation(
+        marker_element.add_properties(
+            DisplayText=display_text,
+            StationName=referent.Name,
+            TextHeight=cfg.text_height
+        )
+        
+        # Create text representations: the text literal and its polyline fallback
+        text_literal_rep, polyline_text_rep = self.text_creator.create_text_representations(
             display_text,
-            self.config['text_position_offset'],
-            self.config['text_height'],
-            self.config['text_color']
+            cfg.text_position_offset,
+            cfg.text_height,
+            cfg.text_color,
+            cfg.text_width_factor,
+            polyline=cfg.polyline_text_fallback
         )
         
         # Get marker representation
@@ -1123,17 +2052,22 @@ class AlignmentMarkerProcessor:
             self.context_3d
         )
         
-        # Combine representations
-        product_shape = self.model.create_entity(
+        # Combine representations; without a separate annotation the polyline
+        # text is carried by the marker itself
+        representations = [marker_rep, text_literal_rep]
+        separate_polyline = cfg.separate_polyline_annotation
+        if polyline_text_rep is not None and not separate_polyline:
+            representations.append(polyline_text_rep)
+        product_shape = model.create_entity(
             "IfcProductDefinitionShape",
-            Representations=[marker_rep, text_literal_rep]
+            Representations=representations
         )
         
         # Create main marker element
-        main_element = self.model.create_entity(
+        main_element = model.create_entity(
             "IfcBuildingElementProxy",
             GlobalId=generate_ifc_guid(),
-            OwnerHistory=self.owner_history,
+            OwnerHistory=owner_history,
             Name=f"Station_{display_text}",
             Description=f"{marker_type.capitalize()} marker for station {referent.Name}",
             ObjectType="StationMarker",
@@ -1145,33 +2079,27 @@ class AlignmentMarkerProcessor:
         # Attach properties
         if marker_element.properties:
             pset = marker_element.create_property_set("Pset_StationText")
-            self.model.create_entity(
+            model.create_entity(
                 "IfcRelDefinesByProperties",
                 GlobalId=generate_ifc_guid(),
-                OwnerHistory=self.owner_history,
+                OwnerHistory=owner_history,
                 RelatedObjects=[main_element],
                 RelatingPropertyDefinition=pset
             )
         
         elements = [main_element]
         
-        # Create fallback polyline text
-        polyline_text_rep = self.text_creator.create_polyline_text_representation(
-            display_text,
-            self.config['text_height'],
-            self.config['text_width_factor']
-        )
-        
-        if polyline_text_rep:
-            annotation_shape = self.model.create_entity(
+        # Fallback polyline text as a separate annotation
+        if polyline_text_rep is not None and separate_polyline:
+            annotation_shape = model.create_entity(
                 "IfcProductDefinitionShape",
                 Representations=[polyline_text_rep]
             )
             
-            text_annotation = self.model.create_entity(
+            text_annotation = model.create_entity(
                 "IfcAnnotation",
                 GlobalId=generate_ifc_guid(),
-                OwnerHistory=self.owner_history,
+                OwnerHistory=owner_history,
                 Name=f"Station_Text_{display_text}",
                 Description=f"Polyline text annotation for station {referent.Name}",
                 ObjectType="TextAnnotation",
@@ -1181,7 +2109,8 @@ class AlignmentMarkerProcessor:
             
             elements.append(text_annotation)
         
-        logger.info(f"Created {marker_type} marker '{display_text}' for station {station_value}")
+        if debug:
+            logger.debug(f"Created {marker_type} marker '{display_text}' for station {station_value}")
         
         return elements
     
@@ -1191,64 +2120,120 @@ class AlignmentMarkerProcessor:
         
         Returns:
         --------
-        list : List of vertical segment dictionaries
+        VerticalSegments : Segment columns ordered by start distance
+        """
+        # The rows are sorted straight off the generator into the column store,
+        # so no intermediate per-segment list or dict is built
+        return VerticalSegments.from_rows(self._iter_vertical_segment_rows())
+    
+    def _iter_vertical_segment_rows(self):
+        """
+        Yield one (start_distance, length, start_height, start_grade, end_grade,
+        curve_type, radius) tuple per vertical segment, see VerticalSegments.FIELDS.
+        
+        Segments without a start distance or horizontal length are skipped.
         """
-        vertical_segments = []
-        alignment_verticals = self.model.by_type("IfcAlignmentVertical")
+        alignment_verticals = self._by_type("IfcAlignmentVertical")
         
         for vertical in alignment_verticals:
-            for rel in self.model.by_type("IfcRelNests"):
-                if rel.RelatingObject == vertical:
-                    for segment_entity in rel.RelatedObjects:
-                        # Handle both IFC 4.3 (DesignParameters) and IFC 4.0 (direct attributes)
-                        if hasattr(segment_entity, 'DesignParameters'):
-                            # IFC 4.3 format
-                            segment = segment_entity.DesignParameters
-                            if hasattr(segment, 'StartDistAlong') and hasattr(segment, 'HorizontalLength'):
-                                vertical_segments.append({
-                                    'start_distance': segment.StartDistAlong,
-                                    'length': segment.HorizontalLength,
-                                    'start_height': segment.StartHeight,
-                                    'start_grade': segment.StartGradient,
-                                    'end_grade': segment.EndGradient,
-                                    'curve_type': str(segment.PredefinedType),
-                                    'radius': getattr(segment, 'StartRadiusOfCurvature', None)
-                                })
-                        elif segment_entity.is_a("IfcAlignmentVerticalSegment"):
-                            # IFC 4.0 format - attributes directly on segment
-                            if hasattr(segment_entity, 'StartDistAlong') and hasattr(segment_entity, 'HorizontalLength'):
-                                vertical_segments.append({
-                                    'start_distance': segment_entity.StartDistAlong,
-                                    'length': segment_entity.HorizontalLength,
-                                    'start_height': segment_entity.StartHeight,
-                                    'start_grade': segment_entity.StartGradient,
-                                    'end_grade': segment_entity.EndGradient,
-                                    'curve_type': str(segment_entity.PredefinedType) if hasattr(segment_entity, 'PredefinedType') else '.CONSTANTGRADIENT.',
-                                    'radius': getattr(segment_entity, 'StartRadiusOfCurvature', None)
-                                })
-        
-        return sorted(vertical_segments, key=lambda x: x['start_distance'])
+            for rel in self._nesting_relationships(vertical):
+                for segment_entity in rel.RelatedObjects:
+                    # Handle both IFC 4.3 (DesignParameters) and IFC 4.0 (direct attributes)
+                    if hasattr(segment_entity, 'DesignParameters'):
+                        # IFC 4.3 format
+                        segment = segment_entity.DesignParameters
+                    elif segment_entity.is_a("IfcAlignmentVerticalSegment"):
+                        # IFC 4.0 format - attributes directly on segment
+                        segment = segment_entity
+                    else:
+                        continue
+                    
+                    start_distance = getattr(segment, 'StartDistAlong', None)
+                    length = getattr(segment, 'HorizontalLength', None)
+                    if start_distance is not None and length is not None:
+                        yield (
+                            start_distance,
+                            length,
+                            segment.StartHeight,
+                            segment.StartGradient,
+                            segment.EndGradient,
+                            str(segment.PredefinedType) if hasattr(segment, 'PredefinedType') else '.CONSTANTGRADIENT.',
+                            getattr(segment, 'StartRadiusOfCurvature', None)
+                        )
+    
+    def _nesting_relationships(self, parent):
+        """
+        IfcRelNests relationships whose RelatingObject is parent, in file order.
+        
+        Uses the IsNestedBy inverse where the schema defines it, which reaches the
+        parent's own relationships without reading every IfcRelNests in the model
+        (with lazy loading, that would parse all of them). Otherwise all nesting
+        relationships are indexed by parent once and the index is reused.
+        """
+        nests = getattr(parent, 'IsNestedBy', None)
+        if nests is not None:
+            return sorted(nests, key=lambda rel: rel.id())
+        
+        nests_by_parent = self._nests_by_parent
+        if nests_by_parent is None:
+            nests_by_parent = self._nests_by_parent = {}
+            for rel in self._by_type("IfcRelNests"):
+                if rel.RelatingObject is not None:
+                    nests_by_parent.setdefault(rel.RelatingObject.id(), []).append(rel)
+        return nests_by_parent.get(parent.id(), ())
+    
+    def get_slope_detector(self, vertical_segments):
+        """
+        Return the slope change detector for the given vertical segments.
+        
+        The detector precomputes segment arrays on construction, so one instance is
+        shared by every caller that passes the same segment list.
+        
+        Args:
+            vertical_segments (VerticalSegments): Segments from extract_vertical_segments
+        
+        Returns:
+            SlopeChangeDetector: Detector using the configured grade change threshold and
+            duplicate station tolerance
+        """
+        if self._detector is None or self._detector[0] is not vertical_segments:
+            detector = SlopeChangeDetector(
+                vertical_segments, self._cfg.grade_change_threshold, self._cfg.duplicate_station_tolerance
+            )
+            self._detector = (vertical_segments, detector)
+        return self._detector[1]
     
     def build_referent_map(self):
         """
         Build map of station values to referent objects
         
+        The map is built once per processor and cached; see referent_map.
+        
         Returns:
         --------
         dict : Station value -> referent object mapping
         """
-        referent_map = {}
-        referents = self.model.by_type("IfcReferent")
-        
-        for ref in referents:
-            if ref.Name:
-                try:
-                    station_val = float(ref.Name)
-                    referent_map[station_val] = ref
-                except Exception:
-                    pass
+        return self.referent_map
+    
+    @property
+    def referent_map(self):
+        """
+        Station value -> IfcReferent mapping, parsed on first access and cached.
         
-        return referent_map
+        The sorted station values are kept alongside (see _sorted_stations) for
+        binary-search lookups of the nearest referent.
+        """
+        if self._referent_map is None:
+            referents, station_values = self._station_referents()
+            self._referent_map = dict(zip(station_values.tolist(), referents))
+            self._referent_stations = sorted(self._referent_map)
+        return self._referent_map
+    
+    def _sorted_stations(self, referent_map):
+        """Sorted station values of referent_map, reusing the cached list for referent_map"""
+        if referent_map is self._referent_map:
+            return self._referent_stations
+        return sorted(referent_map)
     
     def process_slope_changes(
         self, 
@@ -1276,33 +2261,49 @@ class AlignmentMarkerProcessor:
             - Annotates with from/to grade information
             - Handles missing referents gracefully by skipping
         """
+        # Without referents there is nothing to place markers on
+        if not referent_map:
+            return []
+        
         elements = []
         
-        for change in slope_changes:
+        # Nearest referent for every change in one binary search over the sorted
+        # stations; a tie goes to the lower station, an exact match is its own nearest
+        sorted_stations = self._sorted_stations(referent_map)
+        station_array = np.array(sorted_stations, dtype=np.float64)
+        change_stations = np.array([change['station'] for change in slope_changes], dtype=np.float64)
+        upper = np.searchsorted(station_array, change_stations, side='left')
+        last = station_array.size - 1
+        lower_distance = change_stations - station_array[np.clip(upper - 1, 0, last)]
+        upper_distance = station_array[np.minimum(upper, last)] - change_stations
+        use_lower = (upper > last) | ((upper > 0) & (lower_distance <= upper_distance))
+        nearest_indices = np.where(use_lower, upper - 1, upper)
+        # Offset along alignment from nearest station to actual station
+        station_offsets = (change_stations - station_array[nearest_indices]).tolist()
+        
+        # Resolve loop-invariant settings once
+        cfg = self._cfg
+        title_offset = cfg.text_position_offset
+        text_height_large = cfg.text_height_large
+        text_height_medium = cfg.text_height_medium
+        text_color = cfg.text_color
+        offset_height = cfg.slope_marker_height_offset
+        
+        for change, nearest_index, station_offset in zip(slope_changes, nearest_indices.tolist(), station_offsets):
             station = change['station']
             
-            # Find referent for this station (exact or nearest)
-            base_referent = referent_map.get(station)
-            station_offset = 0.0
-            
-            if not base_referent:
-                nearest_station = min(referent_map.keys(), 
-                                    key=lambda s: abs(s - station))
-                base_referent = referent_map[nearest_station]
-                # Calculate offset along alignment from nearest station to actual station
-                station_offset = station - nearest_station
+            # Referent for this station (exact or nearest)
+            base_referent = referent_map[sorted_stations[nearest_index]]
             
-            if not base_referent or not base_referent.ObjectPlacement:
+            if not base_referent.ObjectPlacement:
                 continue
             
             # Create placement for slope change marker with station offset
-            offset_height = self.config['slope_marker_height_offset']
             
             # If there's a station offset, we need to position along the alignment direction
             if abs(station_offset) > 0.01:  # More than 1cm offset
                 # Extract alignment direction from referent placement
-                align_dir = PlacementCalculator.calculate_alignment_direction(base_referent.ObjectPlacement)
-                perp_dir = PlacementCalculator.calculate_perpendicular_direction(base_referent.ObjectPlacement)
+                align_dir, perp_dir = self._placement_directions(base_referent.ObjectPlacement)
                 
                 # Create offset vector: station_offset along alignment + height offset upward
                 offset_vector = (
@@ -1312,33 +2313,34 @@ class AlignmentMarkerProcessor:
                 )
                 
                 # Create placement with perpendicular orientation at offset location
-                offset_point = self.model.create_entity("IfcCartesianPoint", Coordinates=offset_vector)
-                y_direction = self.model.create_entity("IfcDirection", DirectionRatios=perp_dir)
-                z_direction = self.model.create_entity("IfcDirection", DirectionRatios=(0.0, 0.0, 1.0))
+                offset_point = PlacementCalculator._get_cartesian_point(self.model, offset_vector)
+                y_direction = PlacementCalculator._get_direction(self.model, perp_dir)
+                z_direction = PlacementCalculator._get_z_axis(self.model)
                 
-                local_axis_placement = self.model.create_entity("IfcAxis2Placement3D",
-                                                               Location=offset_point,
-                                                               Axis=z_direction,
-                                                               RefDirection=y_direction)
+                local_axis_placement = PlacementCalculator._get_axis_placement(
+                    self.model, offset_point, z_direction, y_direction
+                )
                 
-                marker_placement = self.model.create_entity("IfcLocalPlacement",
-                                                           PlacementRelTo=base_referent.ObjectPlacement,
-                                                           RelativePlacement=local_axis_placement)
+                # IfcLocalPlacement(PlacementRelTo, RelativePlacement)
+                marker_placement = self.model.create_entity(
+                    "IfcLocalPlacement", base_referent.ObjectPlacement, local_axis_placement
+                )
             else:
                 # No offset needed, use standard perpendicular placement
                 marker_placement = PlacementCalculator.create_marker_placement(
                     self.model,
                     base_referent.ObjectPlacement,
-                    offset_height
+                    offset_height,
+                    self._placement_directions(base_referent.ObjectPlacement)[1]
                 )
             
             # Create slope change marker
             marker_element = self.slope_factory.create_slope_change_marker(
                 change,
-                radius=self.config['slope_marker_radius'],
-                thickness=self.config['slope_marker_thickness'],
-                color=self.config['slope_marker_color'],
-                pset_name=self.config['property_set_name']
+                radius=cfg.slope_marker_radius,
+                thickness=cfg.slope_marker_thickness,
+                color=cfg.slope_marker_color,
+                pset_name=cfg.property_set_name
             )
             
             element = marker_element.create_ifc_element(
@@ -1346,19 +2348,18 @@ class AlignmentMarkerProcessor:
                 description=f"Slope change at station {station:.1f}m",
                 placement=marker_placement,
                 color_name="Orange",
-                pset_name=self.config['property_set_name']
+                pset_name=cfg.property_set_name
             )
             
             elements.append(element)
             
             # Create text annotations for slope change
             # Title text showing location
-            title_offset = self.config.get('text_position_offset', (0.0, 0.2, 0.0))
             title_text_rep = self.text_creator.create_text_literal_representation(
                 f"Slope Change at {station:.1f}m",
                 position_offset=(title_offset[0], title_offset[1] - 0.2, title_offset[2] + 1.2),
-                height=self.config.get('text_height_large', 0.6),
-                color=self.config.get('text_color', (0.0, 0.0, 0.0))
+                height=text_height_large,
+                color=text_color
             )
             
             title_annotation = self.model.create_entity(
@@ -1379,8 +2380,8 @@ class AlignmentMarkerProcessor:
             grade_text_rep = self.text_creator.create_text_literal_representation(
                 f"Grade: {change['from_grade']*100:.1f}% → {change['to_grade']*100:.1f}% ({grade_change:+.1f}%)",
                 position_offset=(title_offset[0], title_offset[1] - 0.2, title_offset[2] + 0.8),
-                height=self.config.get('text_height_medium', 0.5),
-                color=self.config.get('text_color', (0.0, 0.0, 0.0))
+                height=text_height_medium,
+                color=text_color
             )
             
             grade_annotation = self.model.create_entity(
@@ -1406,7 +2407,7 @@ class AlignmentMarkerProcessor:
         -----------
         referent_map : dict
             Station to referent mapping
-        vertical_segments : list
+        vertical_segments : VerticalSegments
             Vertical alignment segments
             
         Returns:
@@ -1414,29 +2415,35 @@ class AlignmentMarkerProcessor:
         list : Created IFC elements
         """
         elements = []
-        detector = SlopeChangeDetector(vertical_segments)
+        detector = self.get_slope_detector(vertical_segments)
+        
+        # Process every other station (skipping referents without placement),
+        # fetching each referent and its placement once
+        stations = []
+        referent_placements = []
+        for station in self._sorted_stations(referent_map)[::2]:
+            referent_placement = referent_map[station].ObjectPlacement
+            if referent_placement:
+                stations.append(station)
+                referent_placements.append(referent_placement)
+        heights = detector.heights_at(stations).tolist()
+        grades = detector.grades_at(stations).tolist()
+        
+        # Resolve loop-invariant settings once
+        cfg = self._cfg
+        text_offset = cfg.text_position_offset
+        text_height_medium = cfg.text_height_medium
+        text_color = cfg.text_color
+        
+        # Create all arrow placements in one pass - oriented along alignment direction
+        offset_height = cfg.arrow_height_offset
+        _, arrow_placements = PlacementCalculator.create_marker_and_arrow_placements(
+            self.model,
+            [(referent_placement, None, offset_height) for referent_placement in referent_placements],
+            [self._placement_directions(referent_placement) for referent_placement in referent_placements]
+        )
         
-        # Process every other station
-        stations = sorted(referent_map.keys())
-        for station in stations[::2]:
-            referent = referent_map[station]
-            
-            if not referent.ObjectPlacement:
-                continue
-            
-            # Calculate grade at this station
-            grade = self._get_grade_at_station(station, vertical_segments)
-            height = detector._calculate_height_at_station(station)
-            
-            # Create arrow placement - oriented along alignment direction
-            offset_height = self.config['arrow_height_offset']
-            
-            arrow_placement = PlacementCalculator.create_arrow_placement(
-                self.model,
-                referent.ObjectPlacement,
-                offset_height
-            )
-            
+        for station, height, grade, arrow_placement in zip(stations, heights, grades, arrow_placements):
             # Create directional arrow
             is_upward = grade >= 0
             marker_element = self.slope_factory.create_directional_arrow(
@@ -1444,11 +2451,11 @@ class AlignmentMarkerProcessor:
                 grade,
                 height,
                 is_upward=is_upward,
-                length=self.config['arrow_length'],
-                width=self.config['arrow_width'],
-                thickness=self.config['arrow_thickness'],
+                length=cfg.arrow_length,
+                width=cfg.arrow_width,
+                thickness=cfg.arrow_thickness,
                 segment_type="intermediate",
-                pset_name=self.config['property_set_name']
+                pset_name=cfg.property_set_name
             )
             
             color_name = "Green" if is_upward else "Red"
@@ -1457,19 +2464,17 @@ class AlignmentMarkerProcessor:
                 description=f"Slope information at station {station:.1f}m",
                 placement=arrow_placement,
                 color_name=color_name,
-                pset_name=self.config['property_set_name']
+                pset_name=cfg.property_set_name
             )
             
             elements.append(element)
             
             # Create text annotation for grade percentage
-            text_offset = self.config.get('text_position_offset', (0.0, 0.2, 0.0))
-            
             slope_text_rep = self.text_creator.create_text_literal_representation(
                 f"Grade: {grade*100:.1f}%",
                 position_offset=(text_offset[0], text_offset[1] - 0.2, text_offset[2] + 0.6),
-                height=self.config.get('text_height_medium', 0.5),
-                color=self.config.get('text_color', (0.0, 0.0, 0.0))
+                height=text_height_medium,
+                color=text_color
             )
             
             slope_annotation = self.model.create_entity(
@@ -1488,7 +2493,16 @@ class AlignmentMarkerProcessor:
         return elements
     
     def _get_grade_at_station(self, station, vertical_segments):
-        """Calculate grade at specific station"""
+        """
+        Calculate grade at specific station
+        
+        For VerticalSegments (as returned by extract_vertical_segments) the cached
+        detector's binary search is used; plain lists of segment dictionaries are
+        scanned in order. For many stations use SlopeChangeDetector.grades_at.
+        """
+        if isinstance(vertical_segments, VerticalSegments):
+            return self.get_slope_detector(vertical_segments)._calculate_grade_at_station(station)
+        
         for segment in vertical_segments:
             start_dist = segment['start_distance']
             length = segment['length']
@@ -1516,7 +2530,7 @@ class AlignmentMarkerProcessor:
             return
         
         # Find or create site
-        sites = self.model.by_type("IfcSite")
+        sites = self._by_type("IfcSite")
         if sites:
             site = sites[0]
         else:
@@ -1526,6 +2540,8 @@ class AlignmentMarkerProcessor:
                 OwnerHistory=self.owner_history,
                 Name="Alignment Marker Site"
             )
+            # The cached (empty) site list is stale now
+            self._by_type_cache.pop("IfcSite", None)
             
             self.model.create_entity(
                 "IfcRelAggregates",
@@ -1535,20 +2551,108 @@ class AlignmentMarkerProcessor:
                 RelatedObjects=[site]
             )
         
-        # Create spatial containment
-        self.model.create_entity(
-            "IfcRelContainedInSpatialStructure",
-            GlobalId=generate_ifc_guid(),
-            OwnerHistory=self.owner_history,
-            RelatedElements=elements,
-            RelatingStructure=site
-        )
+        # Create spatial containment, one relationship per chunk of elements
+        chunk_size = self.CONTAINMENT_CHUNK_SIZE
+        for start in range(0, len(elements), chunk_size):
+            self.model.create_entity(
+                "IfcRelContainedInSpatialStructure",
+                GlobalId=generate_ifc_guid(),
+                OwnerHistory=self.owner_history,
+                RelatedElements=elements[start:start + chunk_size],
+                RelatingStructure=site
+            )
 
 
 # ============================================================================
 # MAIN FUNCTION
 # ============================================================================
 
+def open_model(input_file):
+    """
+    Open an IFC file for marker creation.
+    
+    Uses lazy loading where the installed ifcopenshell supports it: the file is
+    indexed in one quick pass and each instance's attributes are parsed on first
+    access. Marker creation only reads the referents, placements and vertical
+    segments, so most of a large model is never parsed. Older ifcopenshell versions
+    without the option get a regular open. Streaming mode is not used, since it
+    returns a read-only iterator and markers are written back into the model.
+    
+    Args:
+        input_file (str): Path to the IFC file
+    
+    Returns:
+        ifcopenshell.file: The opened model
+    """
+    try:
+        return ifcopenshell.open(input_file, lazy=True)
+    except TypeError:
+        # ifcopenshell without the lazy keyword
+        return ifcopenshell.open(input_file)
+
+
+# Largest model (by entity count) that save_model serializes in memory. Marker
+# models measure 45-55 bytes per entity in STEP, so this is roughly 25-50 MB of
+# output; the string and its encoded copy are both held while writing. Larger
+# models are streamed to disk by model.write
+IN_MEMORY_WRITE_MAX_ENTITIES = 500000
+
+# Output buffer size for save_model's in-memory path
+WRITE_BUFFER_SIZE = 8 * 1024 * 1024
+
+
+def _entity_count(model):
+    """
+    Number of entity instances in an IFC model.
+    
+    Args:
+        model (ifcopenshell.file): The model
+    
+    Returns:
+        int or None: The count, or None when this ifcopenshell cannot report it
+    """
+    try:
+        return len(model)
+    except TypeError:
+        # ifcopenshell 0.8+ files have no len(); count their instance ids
+        entity_names = getattr(model, 'entity_names', None)
+        return len(entity_names()) if entity_names is not None else None
+
+
+def save_model(model, output_file):
+    """
+    Write an IFC model to a STEP file.
+    
+    Models up to IN_MEMORY_WRITE_MAX_ENTITIES entities are serialized to one
+    string and written through a WRITE_BUFFER_SIZE buffer, about a third faster
+    than model.write, which writes instance by instance. The file contents are
+    identical. Larger models, other formats (e.g. .ifcZIP) and ifcopenshell
+    versions without file.to_string use model.write, which keeps peak memory low.
+    
+    Args:
+        model (ifcopenshell.file): The model to write
+        output_file (str or os.PathLike): Path of the output file
+    """
+    output_file = os.fspath(output_file)
+    if not output_file.lower().endswith('.ifc') or not hasattr(model, 'to_string'):
+        model.write(output_file)
+        return
+    entity_count = _entity_count(model)
+    if entity_count is None or entity_count > IN_MEMORY_WRITE_MAX_ENTITIES:
+        model.write(output_file)
+        return
+    
+    data = model.to_string().encode('utf-8')
+    # A buffered writer's write() writes all of data (or raises)
+    with open(output_file, 'wb', buffering=WRITE_BUFFER_SIZE) as output:
+        output.write(data)
+
+
+def _log_banner(title):
+    """Log a section banner as a single record"""
+    logger.info("\n%s\n%s\n%s", "="*60, title, "="*60)
+
+
 def create_alignment_markers(input_file, output_file, add_slope_analysis=True, **config):
     """
     Main entry point for creating alignment markers with optional slope analysis.
@@ -1579,6 +2683,8 @@ def create_alignment_markers(input_file, output_file, add_slope_analysis=True, *
             - slope_marker_height_offset (float): Vertical offset for slope markers
             - arrow_height_offset (float): Vertical offset for arrows
             - grade_change_threshold (float): Minimum grade change to detect (decimal)
+            - duplicate_station_tolerance (float): Optional distance in meters within which a
+              known slope change duplicates a detected one. Defaults to 0.5.
             - known_slope_changes (list): Optional list of manually specified slope changes
             
     Returns:
@@ -1600,25 +2706,22 @@ def create_alignment_markers(input_file, output_file, add_slope_analysis=True, *
         ... )
     """
     # Load the IFC model
-    model = ifcopenshell.open(input_file)
+    model = open_model(input_file)
     
     # Initialize the alignment marker processor with configuration
     processor = AlignmentMarkerProcessor(model, config)
     
     # STEP 1: Create station markers at all referent points
-    logger.info("\n" + "="*60)
-    logger.info("CREATING STATION MARKERS")
-    logger.info("="*60)
-    station_elements = processor.process_station_markers()
-    
-    all_elements = station_elements
-    slope_elements = []
+    _log_banner("CREATING STATION MARKERS")
+    # Every category is appended to this one list, which goes to the spatial
+    # structure as is; only the per-category counts are kept for the summary
+    all_elements = processor.process_station_markers()
+    station_count = len(all_elements)
+    slope_count = 0
     
     # STEP 2: Optionally add slope analysis
     if add_slope_analysis:
-        logger.info("\n" + "="*60)
-        logger.info("ADDING SLOPE ANALYSIS")
-        logger.info("="*60)
+        _log_banner("ADDING SLOPE ANALYSIS")
         
         # Extract vertical alignment segments
         vertical_segments = processor.extract_vertical_segments()
@@ -1630,7 +2733,7 @@ def create_alignment_markers(input_file, output_file, add_slope_analysis=True, *
             logger.info(f"Found {len(referent_map)} station referents")
             
             # Detect significant grade changes
-            detector = SlopeChangeDetector(vertical_segments, config.get('grade_change_threshold', 0.01))
+            detector = processor.get_slope_detector(vertical_segments)
             slope_changes = detector.detect_slope_changes()
             
             # Optionally add manually specified slope changes
@@ -1640,13 +2743,12 @@ def create_alignment_markers(input_file, output_file, add_slope_analysis=True, *
             logger.info(f"Identified {len(slope_changes)} slope change points")
             
             # Create slope change markers (orange circles at grade transitions)
-            slope_change_elements = processor.process_slope_changes(slope_changes, referent_map)
+            all_elements.extend(processor.process_slope_changes(slope_changes, referent_map))
             
             # Create directional arrows at stations showing slope direction
-            station_slope_elements = processor.process_station_slopes(referent_map, vertical_segments)
+            all_elements.extend(processor.process_station_slopes(referent_map, vertical_segments))
             
-            slope_elements = slope_change_elements + station_slope_elements
-            all_elements.extend(slope_elements)
+            slope_count = len(all_elements) - station_count
         else:
             logger.warning("No vertical alignment segments found - skipping slope analysis")
     
@@ -1654,28 +2756,34 @@ def create_alignment_markers(input_file, output_file, add_slope_analysis=True, *
     processor.add_to_spatial_structure(all_elements)
     
     # Save model
-    model.write(output_file)
-    
-    # Print summary
-    logger.info("\n" + "="*60)
-    logger.info("SUMMARY")
-    logger.info("="*60)
-    logger.info(f"Saved IFC file to: {output_file}")
-    logger.info(f"\nCreated {len(station_elements)} station marker elements:")
-    logger.info(f"  - Start/End stations: RED circular markers ({config['circle_radius']}m radius)")
-    logger.info(f"  - Intermediate stations: GREEN triangular markers ({config['triangle_height']}m height)")
-    logger.info(f"  - All positioned {config['marker_height_offset']}m above alignment")
-    logger.info(f"  - Include {config['text_height']}m tall text labels")
-    
-    if add_slope_analysis and slope_elements:
-        logger.info(f"\nCreated {len(slope_elements)} slope analysis elements:")
-        logger.info(f"  - Slope change markers (orange circles): {config['slope_marker_radius']}m radius")
-        logger.info(f"  - Directional arrows (green/red): {config['arrow_length']}m length")
-        logger.info(f"  - Positioned {config['slope_marker_height_offset']}m and {config['arrow_height_offset']}m above alignment")
-    elif add_slope_analysis:
+    save_model(model, output_file)
+    
+    # Print summary as one log record, built only when INFO is enabled
+    if logger.isEnabledFor(logging.INFO):
+        cfg = processor.cfg
+        summary = [
+            "\n" + "="*60,
+            "SUMMARY",
+            "="*60,
+            f"Saved IFC file to: {output_file}",
+            f"\nCreated {station_count} station marker elements:",
+            f"  - Start/End stations: RED circular markers ({cfg.circle_radius}m radius)",
+            f"  - Intermediate stations: GREEN triangular markers ({cfg.triangle_height}m height)",
+            f"  - All positioned {cfg.marker_height_offset}m above alignment",
+            f"  - Include {cfg.text_height}m tall text labels",
+        ]
+        if add_slope_analysis and slope_count:
+            summary += [
+                f"\nCreated {slope_count} slope analysis elements:",
+                f"  - Slope change markers (orange circles): {cfg.slope_marker_radius}m radius",
+                f"  - Directional arrows (green/red): {cfg.arrow_length}m length",
+                f"  - Positioned {cfg.slope_marker_height_offset}m and {cfg.arrow_height_offset}m above alignment",
+            ]
+        summary.append("="*60 + "\n")
+        logger.info("\n".join(summary))
+    
+    if add_slope_analysis and not slope_count:
         logger.warning("Slope analysis was enabled but no vertical alignment data found")
-    
-    logger.info("="*60 + "\n")
 
 
 if __name__ == "__main__":
@@ -1743,6 +2851,12 @@ if __name__ == "__main__":
     TEXT_HEIGHT = 1.0               # Height of text characters in meters
     TEXT_WIDTH_FACTOR = 0.6         # Width-to-height ratio for characters (0.6 = 60% of height)
     TEXT_COLOR = (0.0, 0.0, 0.0)    # RGB color: Black (R=0.0, G=0.0, B=0.0)
+    # Polyline copies of the labels for viewers without IfcTextLiteral support;
+    # set to False to skip them when only modern viewers are targeted (much faster)
+    POLYLINE_TEXT_FALLBACK = True
+    # True: polyline text is a separate IfcAnnotation per station (viewers can hide it)
+    # False: polyline text is one more representation of the marker itself (fewer entities)
+    SEPARATE_POLYLINE_ANNOTATION = True
     
     # Marker Positioning
     # ------------------
@@ -1817,6 +2931,8 @@ if __name__ == "__main__":
         'text_color': TEXT_COLOR,
         'marker_height_offset': MARKER_HEIGHT_OFFSET,
         'text_position_offset': TEXT_POSITION_OFFSET,
+        'polyline_text_fallback': POLYLINE_TEXT_FALLBACK,
+        'separate_polyline_annotation': SEPARATE_POLYLINE_ANNOTATION,
         
         # Slope analysis config
         'slope_marker_radius': SLOPE_MARKER_RADIUS,
@@ -1924,11 +3040,15 @@ class ProcessingStatistics:
         self.warnings.append(message)
     
     def print_summary(self):
-        print(f"\nProcessing Statistics:")
-        print(f"  Station markers: {self.station_markers}")
-        print(f"  Slope changes: {self.slope_changes}")
-        print(f"  Directional arrows: {self.arrows}")
+        # One write instead of one per line
+        lines = [
+            f"\nProcessing Statistics:",
+            f"  Station markers: {self.station_markers}",
+            f"  Slope changes: {self.slope_changes}",
+            f"  Directional arrows: {self.arrows}",
+        ]
         if self.warnings:
-            print(f"  Warnings: {len(self.warnings)}")
+            lines.append(f"  Warnings: {len(self.warnings)}")
         if self.errors:
-            print(f"  Errors: {len(self.errors)}")
+            lines.append(f"  Errors: {len(self.errors)}")
+        print("\n".join(lines))
@@ -55,10 +55,11 @@ Author: AFRY
 Date: 2025
 """
 
+import os
 import ifcopenshell
+import numpy as np
 from abc import ABC, abstractmethod
-import uuid
-import base64
+import weakref
 import logging
 
 __author__ = 'Eirik Rosbach'
@@ -71,12 +72,58 @@ __status__ = ' Prototype'
 # At module level
 logger = logging.getLogger(__name__)
 
+# Number of GlobalIds generate_ifc_guid draws from one batch of random bytes
+GUID_POOL_SIZE = 256
+
+# IFC base-64 digits, indexed by 6-bit value
+_IFC_GUID_CHARS = np.frombuffer(
+    b"0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_$", dtype=np.uint8
+)
+
+# Constant entities shared per IFC model: {model: {key: entity}}
+# Weak keys so the cache never keeps a closed model alive.
+_shared_entities = weakref.WeakKeyDictionary()
+
+# Pre-generated GlobalIds handed out by generate_ifc_guid
+_guid_pool = []
+if hasattr(os, 'register_at_fork'):
+    # A forked child must not hand out the GUIDs its parent will also use
+    os.register_at_fork(after_in_child=_guid_pool.clear)
+
+
+def generate_ifc_guids(count):
+    """
+    Generate many IFC GUIDs at once.
+    
+    Draws all random bytes in one call, stamps them as version 4 UUIDs and encodes
+    them to the 22-character IFC form with array operations, giving the same
+    result as ifcopenshell.guid.compress(uuid.uuid4().hex) for each GUID.
+    
+    Args:
+        count (int): Number of GUIDs to generate
+    
+    Returns:
+        list: count distinct 22-character IFC GUID strings
+    """
+    raw = np.frombuffer(os.urandom(16 * count), dtype=np.uint8).reshape(count, 16).copy()
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # UUID version 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+    
+    # 128 bits left-padded to 132 = 22 digits of 6 bits, most significant first
+    bits = np.zeros((count, 132), dtype=np.uint8)
+    bits[:, 4:] = np.unpackbits(raw, axis=1)
+    digits = bits.reshape(count, 22, 6) @ np.array([32, 16, 8, 4, 2, 1], dtype=np.uint8)
+    
+    encoded = _IFC_GUID_CHARS[digits].tobytes().decode('ascii')
+    return [encoded[k:k + 22] for k in range(0, 22 * count, 22)]
+
+
 def generate_ifc_guid():
     """
     Generate a valid IFC GUID (Globally Unique Identifier).
     
-    Attempts to use ifcopenshell's built-in GUID generator for standard compliance.
-    Falls back to manual UUID-to-GUID conversion if the library method is unavailable.
+    GUIDs are taken from a module-level pool that generate_ifc_guids refills
+    GUID_POOL_SIZE at a time, so the per-element cost is a list pop.
     
     Returns:
         str: A 22-character IFC-compliant GUID string using Base64 encoding with
@@ -94,20 +141,64 @@ def generate_ifc_guid():
         22
     """
     try:
-        # Prefer ifcopenshell's built-in GUID generator for standard compliance
-        return ifcopenshell.guid.new()
-    except (ImportError, AttributeError):
-        # Fallback: Manual GUID generation from UUID4
-        # Generate random 128-bit UUID
-        random_uuid = uuid.uuid4()
-        guid_bytes = random_uuid.bytes
-        
-        # Convert to Base64 encoding
-        guid_base64 = base64.b64encode(guid_bytes).decode('ascii')
-        
-        # Apply IFC-specific character replacements and truncate
-        guid_base64 = guid_base64.replace('+', '_').replace('/', '$').rstrip('=')
-        return guid_base64[:22]  # IFC GUIDs are exactly 22 characters
+        return _guid_pool.pop()
+    except IndexError:
+        _guid_pool.extend(generate_ifc_guids(GUID_POOL_SIZE))
+        return _guid_pool.pop()
+
+
+def shared_entities(model):
+    """
+    Return the dictionary of constant entities shared within an IFC model.
+    
+    Marker geometry, placements and styles reuse the same few points, directions,
+    colours and styles; every module creating them looks them up here, so each
+    value exists once per model however many markers reference it.
+    
+    Args:
+        model (ifcopenshell.file): The IFC model
+    
+    Returns:
+        dict: Mutable mapping from a hashable key to the shared entity
+    """
+    entities = _shared_entities.get(model)
+    if entities is None:
+        entities = _shared_entities[model] = {}
+    return entities
+
+
+def get_shared_entity(model, key, ifc_class, **attributes):
+    """
+    Return the shared entity for key, creating it from the attributes on first use.
+    
+    Keys in use: ('point', coordinates), ('direction', x, y, z) rounded to
+    6 decimals, ('colour', name, red, green, blue), ('surface_style', ...),
+    ('axis2placement3d', location id, axis id, ref direction id) and
+    ('polyline', point ids...).
+    
+    Args:
+        model (ifcopenshell.file): The IFC model
+        key (tuple): Cache key identifying the constant
+        ifc_class (str): IFC class to create on a cache miss
+        **attributes: Attributes for the new entity
+    
+    Returns:
+        entity_instance: The shared entity
+    """
+    entities = shared_entities(model)
+    entity = entities.get(key)
+    if entity is None:
+        entity = entities[key] = model.create_entity(ifc_class, **attributes)
+    return entity
+
+
+def get_shared_colour(model, name, color):
+    """Return the shared IfcColourRgb with this name and (R, G, B) color"""
+    red, green, blue = color
+    return get_shared_entity(
+        model, ('colour', name, red, green, blue), "IfcColourRgb",
+        Name=name, Red=red, Green=green, Blue=blue
+    )
 
 
 class BaseMarker(ABC):
@@ -146,6 +237,14 @@ class BaseMarker(ABC):
         ...         return "CustomColor"
     """
     
+    # Marker objects are created for every station; slots keep them free of a
+    # per-instance __dict__. Subclasses declare slots for their own parameters.
+    __slots__ = ('model', 'color', 'thickness')
+    
+    # Styled geometry items shared per IFC model: {model: {key: IfcExtrudedAreaSolid}}
+    # Weak keys so the cache never keeps a closed model alive.
+    _styled_items = weakref.WeakKeyDictionary()
+    
     def __init__(self, model, color=(1.0, 1.0, 1.0), thickness=0.05):
         """
         Initialize base marker with common properties.
@@ -192,6 +291,17 @@ class BaseMarker(ABC):
         """
         pass
     
+    def _geometry_key(self):
+        """
+        Return a hashable key identifying this marker's geometry, or None.
+        
+        Markers with equal keys produce identical geometry, so their styled geometry
+        item is created once per model and shared by all their representations.
+        Subclasses include every attribute that create_geometry() depends on; the
+        default of None disables sharing for subclasses that do not override it.
+        """
+        return None
+    
     def create_color_style(self, color_name, transparency=0.0):
         """
         Create IFC color and style entities for marker rendering.
@@ -214,14 +324,15 @@ class BaseMarker(ABC):
             - ReflectanceMethod: NOTDEFINED (no specific reflectance model)
             - Uses RGB values from self.color attribute
         """
-        # Create RGB color entity with component values
-        color_rgb = self.model.create_entity(
-            "IfcColourRgb", 
-            Name=color_name,
-            Red=self.color[0],    # Red component (0.0-1.0)
-            Green=self.color[1],  # Green component (0.0-1.0)
-            Blue=self.color[2]    # Blue component (0.0-1.0)
-        )
+        # Markers of the same color share one style per model
+        entities = shared_entities(self.model)
+        key = ('surface_style', color_name, tuple(self.color), transparency)
+        surface_style = entities.get(key)
+        if surface_style is not None:
+            return surface_style
+        
+        # Create RGB color entity with component values (0.0-1.0)
+        color_rgb = get_shared_colour(self.model, color_name, self.color)
         
         # Create rendering style with color and transparency
         surface_style_rendering = self.model.create_entity(
@@ -239,6 +350,7 @@ class BaseMarker(ABC):
             Styles=[surface_style_rendering]
         )
         
+        entities[key] = surface_style
         return surface_style
     
     def create_styled_representation(self, context_3d, color_name=None, transparency=0.0):
@@ -267,24 +379,41 @@ class BaseMarker(ABC):
         Note:
             The IfcStyledItem is created for styling but is not explicitly returned.
             It associates the style with the geometry through the IFC model.
+            Markers with the same _geometry_key() share one styled geometry item; only
+            the shape representation is created per call, since a representation may
+            belong to a single product.
         """
         # Use default color if not specified
         if color_name is None:
             color_name = self.get_default_color_name()
         
-        # Create the 3D geometry
-        geometry = self.create_geometry()
-        
-        # Create the visual style
-        style = self.create_color_style(color_name, transparency)
-        
-        # Associate style with geometry (required for rendering)
-        self.model.create_entity(
-            "IfcStyledItem",
-            Item=geometry,
-            Styles=[style],
-            Name=f"{color_name}StyledItem"
-        )
+        geometry_key = self._geometry_key()
+        items = None
+        geometry = None
+        if geometry_key is not None:
+            geometry_key = (geometry_key, color_name, transparency)
+            items = self._styled_items.get(self.model)
+            if items is None:
+                items = self._styled_items[self.model] = {}
+            geometry = items.get(geometry_key)
+        
+        if geometry is None:
+            # Create the 3D geometry
+            geometry = self.create_geometry()
+            
+            # Create the visual style
+            style = self.create_color_style(color_name, transparency)
+            
+            # Associate style with geometry (required for rendering)
+            self.model.create_entity(
+                "IfcStyledItem",
+                Item=geometry,
+                Styles=[style],
+                Name=f"{color_name}StyledItem"
+            )
+            
+            if items is not None:
+                items[geometry_key] = geometry
         
         # Create the shape representation
         representation = self.model.create_entity(
@@ -297,6 +426,27 @@ class BaseMarker(ABC):
         
         return representation
     
+    def _shared_point(self, coordinates):
+        """Return the shared IfcCartesianPoint at these coordinates for this model"""
+        coordinates = tuple(coordinates)
+        return get_shared_entity(
+            self.model, ('point', coordinates), "IfcCartesianPoint", Coordinates=coordinates
+        )
+    
+    def _shared_direction(self, direction_ratios):
+        """
+        Return the shared IfcDirection for these ratios for this model.
+        
+        Every marker geometry is placed and extruded along the same few axes, so
+        these directions are created once per model and referenced by all solids
+        (and by marker placements, which use the same rounded key).
+        """
+        x, y, z = direction_ratios
+        return get_shared_entity(
+            self.model, ('direction', round(x, 6), round(y, 6), round(z, 6)), "IfcDirection",
+            DirectionRatios=(x, y, z)
+        )
+    
     def _create_standard_placement(self, offset=(0.0, 0.0, 0.0)):
         """
         Create standard axis placement for profile extrusion.
@@ -319,11 +469,12 @@ class BaseMarker(ABC):
             - Local Y: (0, 1, 0) - extrusion direction
             - Local Z: (0, 0, 1) - derived from X and Y (upward)
         """
-        origin = self.model.create_entity("IfcCartesianPoint", Coordinates=offset)
-        axis_z = self.model.create_entity("IfcDirection", DirectionRatios=(0.0, 1.0, 0.0))
-        axis_x = self.model.create_entity("IfcDirection", DirectionRatios=(1.0, 0.0, 0.0))
+        origin = self._shared_point(offset)
+        axis_z = self._shared_direction((0.0, 1.0, 0.0))
+        axis_x = self._shared_direction((1.0, 0.0, 0.0))
         
-        return self.model.create_entity(
+        return get_shared_entity(
+            self.model, ('axis2placement3d', origin.id(), axis_z.id(), axis_x.id()),
             "IfcAxis2Placement3D",
             Location=origin,
             Axis=axis_z,        # Z-axis of placement (extrusion direction)
@@ -344,7 +495,7 @@ class BaseMarker(ABC):
         Returns:
             IfcDirection: Direction entity for IfcExtrudedAreaSolid
         """
-        return self.model.create_entity("IfcDirection", DirectionRatios=direction)
+        return self._shared_direction(direction)
 
 
 class TriangleMarker(BaseMarker):
@@ -373,6 +524,8 @@ class TriangleMarker(BaseMarker):
         >>> geometry = triangle.create_geometry()
     """
     
+    __slots__ = ('height',)
+    
     def __init__(self, model, height=0.5, thickness=0.05, color=(0.0, 0.8, 0.0)):
         """
         Initialize triangle marker for intermediate stations.
@@ -390,6 +543,10 @@ class TriangleMarker(BaseMarker):
         """Return default color name for triangle markers."""
         return "Green"
     
+    def _geometry_key(self):
+        """Key of the triangle geometry: height, thickness and color."""
+        return ("triangle", self.height, self.thickness, tuple(self.color))
+    
     def create_geometry(self):
         """
         Create equilateral triangle geometry.
@@ -477,6 +634,8 @@ class CircleMarker(BaseMarker):
         >>> slope_circle = CircleMarker(model, radius=0.4, color=(1.0, 0.5, 0.0))
     """
     
+    __slots__ = ('radius',)
+    
     def __init__(self, model, radius=0.5, thickness=0.05, color=(1.0, 0.0, 0.0)):
         """
         Initialize circle marker for special station points.
@@ -494,6 +653,10 @@ class CircleMarker(BaseMarker):
         """Return default color name for circle markers."""
         return "Red"
     
+    def _geometry_key(self):
+        """Key of the circle geometry: radius, thickness and color."""
+        return ("circle", self.radius, self.thickness, tuple(self.color))
+    
     def create_geometry(self):
         """
         Create circular disk geometry.
@@ -515,7 +678,7 @@ class CircleMarker(BaseMarker):
             - Result: Circular disk perpendicular to Y-axis
         """
         # Create circle center point in 2D profile plane
-        center = self.model.create_entity("IfcCartesianPoint", Coordinates=(0.0, 0.0))
+        center = self._shared_point((0.0, 0.0))
         
         # Create circle geometry with specified radius
         circle = self.model.create_entity(
@@ -584,6 +747,12 @@ class DirectionalArrow(BaseMarker):
         Use create_arrow_placement() to orient it along the alignment.
     """
     
+    __slots__ = ('length', 'width', 'is_upward')
+    
+    # Colors and color names indexed by is_upward: (downward, upward)
+    _COLORS = ((1.0, 0.0, 0.0), (0.0, 0.8, 0.0))
+    _COLOR_NAMES = ("Red", "Green")
+    
     def __init__(self, model, length=0.6, width=0.3, thickness=0.05, 
                  is_upward=True):
         """
@@ -598,15 +767,19 @@ class DirectionalArrow(BaseMarker):
                                        Defaults to True.
         """
         # Set color based on slope direction
-        color = (0.0, 0.8, 0.0) if is_upward else (1.0, 0.0, 0.0)
-        super().__init__(model, color, thickness)
+        is_upward = bool(is_upward)
+        super().__init__(model, self._COLORS[is_upward], thickness)
         self.length = length
         self.width = width
         self.is_upward = is_upward
         
     def get_default_color_name(self):
         """Return default color name based on slope direction."""
-        return "Green" if self.is_upward else "Red"
+        return self._COLOR_NAMES[self.is_upward]
+    
+    def _geometry_key(self):
+        """Key of the arrow geometry: length, width, thickness and color."""
+        return ("arrow", self.length, self.width, self.thickness, tuple(self.color))
     
     def create_geometry(self):
         """
@@ -658,15 +831,14 @@ class DirectionalArrow(BaseMarker):
         )
         
         # Create placement at origin for horizontal arrow
-        origin = self.model.create_entity("IfcCartesianPoint", 
-                                         Coordinates=(0.0, 0.0, 0.0))
-        placement = self.model.create_entity("IfcAxis2Placement3D", Location=origin)
+        origin = self._shared_point((0.0, 0.0, 0.0))
+        placement = get_shared_entity(
+            self.model, ('axis2placement3d', origin.id(), None, None), "IfcAxis2Placement3D",
+            Location=origin
+        )
         
         # Extrude vertically along Z-axis
-        extrusion_direction = self.model.create_entity(
-            "IfcDirection", 
-            DirectionRatios=(0.0, 0.0, 1.0)  # Vertical extrusion
-        )
+        extrusion_direction = self._shared_direction((0.0, 0.0, 1.0))  # Vertical extrusion
         
         # Create extruded solid by sweeping arrow profile
         return self.model.create_entity(
@@ -723,6 +895,9 @@ class MarkerElement:
         ... )
     """
     
+    # One instance per marker; slots avoid a per-instance __dict__
+    __slots__ = ('model', 'marker_geometry', 'owner_history', 'context_3d', 'properties')
+    
     def __init__(self, model, marker_geometry, owner_history, context_3d):
         """
         Initialize marker element wrapper.
@@ -752,17 +927,21 @@ class MarkerElement:
         """
         self.properties[name] = value
         
-    def add_properties(self, property_dict):
+    def add_properties(self, property_dict=None, **properties):
         """
-        Add multiple properties at once from a dictionary.
+        Add multiple properties at once from a dictionary and/or keyword arguments.
         
         Convenient method for bulk property assignment. All properties will be
         included in the property set when the IFC element is created.
         
         Args:
-            property_dict (dict): Dictionary mapping property names to values
+            property_dict (dict, optional): Dictionary mapping property names to values
+            **properties: Further properties as name=value pairs
         """
-        self.properties.update(property_dict)
+        if property_dict:
+            self.properties.update(property_dict)
+        if properties:
+            self.properties.update(properties)
         
     def create_property_set(self, pset_name="Pset_MarkerInformation"):
         """
@@ -786,26 +965,27 @@ class MarkerElement:
             - str -> IfcLabel
         """
         ifc_properties = []
+        create_entity = self.model.create_entity  # bound once for the loop
         
         for name, value in self.properties.items():
             if isinstance(value, float):
-                ifc_value = self.model.create_entity("IfcReal", wrappedValue=value)
+                ifc_value = create_entity("IfcReal", wrappedValue=value)
             elif isinstance(value, int):
-                ifc_value = self.model.create_entity("IfcInteger", wrappedValue=value)
+                ifc_value = create_entity("IfcInteger", wrappedValue=value)
             elif isinstance(value, bool):
-                ifc_value = self.model.create_entity("IfcBoolean", wrappedValue=value)
+                ifc_value = create_entity("IfcBoolean", wrappedValue=value)
             else:
-                ifc_value = self.model.create_entity("IfcLabel", wrappedValue=str(value))
+                ifc_value = create_entity("IfcLabel", wrappedValue=str(value))
                 
             ifc_properties.append(
-                self.model.create_entity(
+                create_entity(
                     "IfcPropertySingleValue",
                     Name=name,
                     NominalValue=ifc_value
                 )
             )
         
-        return self.model.create_entity(
+        return create_entity(
             "IfcPropertySet",
             GlobalId=generate_ifc_guid(),
             OwnerHistory=self.owner_history,
@@ -838,6 +1018,8 @@ class MarkerElement:
         --------
         IfcBuildingElementProxy
         """
+        create_entity = self.model.create_entity
+        
         # Create styled representation
         representation = self.marker_geometry.create_styled_representation(
             self.context_3d,
@@ -845,12 +1027,12 @@ class MarkerElement:
             transparency
         )
         
-        product_shape = self.model.create_entity(
+        product_shape = create_entity(
             "IfcProductDefinitionShape",
             Representations=[representation]
         )
         
-        element = self.model.create_entity(
+        element = create_entity(
             "IfcBuildingElementProxy",
             GlobalId=generate_ifc_guid(),
             OwnerHistory=self.owner_history,
@@ -865,7 +1047,7 @@ class MarkerElement:
         # Attach property set if properties exist
         if self.properties:
             pset = self.create_property_set(pset_name)
-            self.model.create_entity(
+            create_entity(
                 "IfcRelDefinesByProperties",
                 GlobalId=generate_ifc_guid(),
                 OwnerHistory=self.owner_history,
@@ -895,6 +1077,28 @@ class TextAnnotation:
         ' ': []
     }
     
+    # Glyphs flattened from CHAR_DEFINITIONS, built on first use:
+    # {char: (points array of shape (P, 2), [point count per stroke])}
+    _glyph_cache = None
+    
+    @classmethod
+    def _get_glyph_cache(cls):
+        """Return the flattened glyph table, building it on first use"""
+        if cls._glyph_cache is None:
+            cache = {}
+            for char, char_lines in cls.CHAR_DEFINITIONS.items():
+                char_lines = [line_points for line_points in char_lines if line_points]
+                points = [point for line_points in char_lines for point in line_points]
+                cache[char] = (
+                    np.array(points, dtype=np.float64).reshape(-1, 2),
+                    [len(line_points) for line_points in char_lines]
+                )
+            cls._glyph_cache = cache
+        return cls._glyph_cache
+    
+    # One instance per label; slots avoid a per-instance __dict__
+    __slots__ = ('model', 'text', 'height', 'width_factor')
+    
     def __init__(self, model, text, height=1.0, width_factor=0.6):
         """
         Initialize text annotation
@@ -924,28 +1128,57 @@ class TextAnnotation:
         list of IfcPolyline
         """
         polylines = []
-        x_offset = 0
+        if not self.text:
+            return polylines
+        
+        glyphs = self._get_glyph_cache()
         char_width = self.width_factor * self.height
         char_spacing = char_width * 1.2
         
-        for char in self.text:
-            if char in self.CHAR_DEFINITIONS:
-                char_lines = self.CHAR_DEFINITIONS[char]
-                for line_points in char_lines:
-                    scaled_points = []
-                    for x, y in line_points:
-                        scaled_x = x_offset + x * char_width
-                        scaled_y = y * self.height
-                        point = self.model.create_entity(
-                            "IfcCartesianPoint", 
-                            Coordinates=(scaled_x, scaled_y, 0.0)
-                        )
-                        scaled_points.append(point)
-                    
-                    if scaled_points:
-                        polyline = self.model.create_entity("IfcPolyline", Points=scaled_points)
-                        polylines.append(polyline)
-            
-            x_offset += char_spacing
+        # Running x offset of each character (every character advances the cursor)
+        steps = np.full(len(self.text), char_spacing)
+        steps[0] = 0.0
+        x_offsets = np.cumsum(steps)
+        
+        # Gather the glyph points of the whole label and scale them in one pass
+        glyph_points = []
+        point_offsets = []
+        stroke_sizes = []
+        for char, x_offset in zip(self.text, x_offsets):
+            glyph = glyphs.get(char)
+            if glyph is not None and glyph[1]:
+                points, sizes = glyph
+                glyph_points.append(points)
+                point_offsets.append(np.full(len(points), x_offset))
+                stroke_sizes.extend(sizes)
+        
+        if not glyph_points:
+            return polylines
+        
+        points = np.concatenate(glyph_points)
+        coordinates = np.empty((len(points), 3))
+        coordinates[:, 0] = np.concatenate(point_offsets) + points[:, 0] * char_width
+        coordinates[:, 1] = points[:, 1] * self.height
+        coordinates[:, 2] = 0.0
+        
+        # Labels repeat the same characters at the same positions, so points and
+        # strokes are shared per model rather than created for every label
+        model = self.model
+        entities = shared_entities(model)
+        ifc_points = []
+        for coords in map(tuple, coordinates.tolist()):
+            ifc_point = entities.get(('point', coords))
+            if ifc_point is None:
+                ifc_point = entities[('point', coords)] = model.create_entity("IfcCartesianPoint", coords)
+            ifc_points.append(ifc_point)
+        start = 0
+        for size in stroke_sizes:
+            stroke = ifc_points[start:start + size]
+            key = ('polyline',) + tuple(ifc_point.id() for ifc_point in stroke)
+            polyline = entities.get(key)
+            if polyline is None:
+                polyline = entities[key] = model.create_entity("IfcPolyline", stroke)
+            polylines.append(polyline)
+            start += size
         
         return polylines
@@ -0,0 +1,223 @@
+"""
+Check the vectorized slope calculations against the original scalar formulas.
+
+SlopeChangeDetector computes heights and grades with binary searches and NumPy.
+The reference functions below are the original per-station loops over the
+segment dictionaries; every result must match them exactly, including stations
+before the first segment, after the last one, exactly on segment boundaries and
+on zero-length segments.
+
+Run with pytest, or standalone:
+    python -m tests.test_slope_detector
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from create_alignment_markers_oop import SlopeChangeDetector
+
+
+# A hand-made profile covering the edge cases: a gap between segments, a
+# zero-length tangent and a zero-length curve sharing a boundary, a curve
+# after a tangent and segments given out of station order
+SEGMENTS = [
+    {'start_distance': 100.0, 'length': 50.0, 'start_height': 12.0, 'start_grade': 0.02,
+     'end_grade': 0.02, 'curve_type': '.CONSTANTGRADIENT.'},
+    {'start_distance': 0.0, 'length': 100.0, 'start_height': 10.0, 'start_grade': 0.02,
+     'end_grade': 0.02, 'curve_type': '.CONSTANTGRADIENT.'},
+    {'start_distance': 150.0, 'length': 0.0, 'start_height': 13.0, 'start_grade': 0.02,
+     'end_grade': 0.02, 'curve_type': '.CONSTANTGRADIENT.'},
+    {'start_distance': 150.0, 'length': 0.0, 'start_height': 13.0, 'start_grade': 0.02,
+     'end_grade': -0.01, 'curve_type': '.PARABOLICARC.'},
+    {'start_distance': 150.0, 'length': 80.0, 'start_height': 13.0, 'start_grade': 0.02,
+     'end_grade': -0.03, 'curve_type': '.PARABOLICARC.'},
+    {'start_distance': 260.0, 'length': 40.0, 'start_height': 12.0, 'start_grade': -0.03,
+     'end_grade': -0.03, 'curve_type': '.CONSTANTGRADIENT.'},
+]
+
+
+def reference_height(segments, station):
+    """Original SlopeChangeDetector._calculate_height_at_station"""
+    for segment in segments:
+        start_dist = segment['start_distance']
+        length = segment['length']
+        end_dist = start_dist + length
+        
+        if start_dist <= station <= end_dist:
+            distance_into_segment = station - start_dist
+            start_height = segment['start_height']
+            start_grade = segment['start_grade']
+            end_grade = segment['end_grade']
+            
+            if segment['curve_type'] == '.CONSTANTGRADIENT.':
+                height = start_height + (distance_into_segment * start_grade)
+            elif length > 0:
+                t = distance_into_segment / length
+                grade_change = end_grade - start_grade
+                current_grade = start_grade + (grade_change * t)
+                height = start_height + (distance_into_segment * (start_grade + current_grade) / 2)
+            else:
+                height = start_height
+            return height
+    
+    if segments:
+        last_segment = segments[-1]
+        last_station = last_segment['start_distance'] + last_segment['length']
+        last_height = last_segment['start_height'] + (last_segment['length'] * last_segment['end_grade'])
+        extra_distance = station - last_station
+        return last_height + (extra_distance * last_segment['end_grade'])
+    return 0.0
+
+
+def reference_grade(segments, station):
+    """Original AlignmentMarkerProcessor._get_grade_at_station"""
+    for segment in segments:
+        start_dist = segment['start_distance']
+        length = segment['length']
+        end_dist = start_dist + length
+        
+        if start_dist <= station <= end_dist:
+            if segment['curve_type'] == '.CONSTANTGRADIENT.':
+                return segment['start_grade']
+            if length > 0:
+                t = (station - start_dist) / length
+                grade_diff = segment['end_grade'] - segment['start_grade']
+                return segment['start_grade'] + (t * grade_diff)
+            return segment['start_grade']
+    
+    if segments:
+        return segments[-1]['end_grade']
+    return 0.0
+
+
+def reference_slope_changes(segments, threshold):
+    """Original SlopeChangeDetector.detect_slope_changes"""
+    slope_changes = []
+    for i, segment in enumerate(segments):
+        if abs(segment['start_grade'] - segment['end_grade']) > threshold:
+            end_station = segment['start_distance'] + segment['length']
+            slope_changes.append({
+                'station': end_station,
+                'from_grade': segment['start_grade'],
+                'to_grade': segment['end_grade'],
+                'height': reference_height(segments, end_station),
+                'type': 'curve'
+            })
+        
+        if i > 0:
+            prev_end_grade = segments[i-1]['end_grade']
+            if abs(segment['start_grade'] - prev_end_grade) > threshold:
+                slope_changes.append({
+                    'station': segment['start_distance'],
+                    'from_grade': prev_end_grade,
+                    'to_grade': segment['start_grade'],
+                    'height': segment['start_height'],
+                    'type': 'transition'
+                })
+    return slope_changes
+
+
+def reference_add_known_changes(slope_changes, known_changes, tolerance=0.5):
+    """Original SlopeChangeDetector.add_known_changes"""
+    for known in known_changes:
+        if not any(abs(existing['station'] - known['station']) < tolerance
+                   for existing in slope_changes):
+            slope_changes.append(known)
+    return sorted(slope_changes, key=lambda x: x['station'])
+
+
+def random_segments(rng, count):
+    """Random profile with gaps, overlaps and zero-length segments, in shuffled order"""
+    segments = []
+    distance = 0.0
+    for _ in range(count):
+        length = rng.choice([0.0, rng.uniform(1.0, 80.0)])
+        start_grade = rng.uniform(-0.05, 0.05)
+        end_grade = start_grade if rng.random() < 0.5 else rng.uniform(-0.05, 0.05)
+        segments.append({
+            'start_distance': distance,
+            'length': length,
+            'start_height': rng.uniform(0.0, 10.0),
+            'start_grade': start_grade,
+            'end_grade': end_grade,
+            'curve_type': '.CONSTANTGRADIENT.' if start_grade == end_grade
+                          else rng.choice(['.CIRCULARARC.', '.PARABOLICARC.'])
+        })
+        distance += length if rng.random() < 0.7 else length + rng.uniform(-30.0, 30.0)
+    rng.shuffle(segments)
+    return segments
+
+
+def probe_stations(segments, rng=None):
+    """Stations before, after, inside and exactly on the boundaries of the segments"""
+    stations = [-50.0, 0.0, 1e6]
+    for segment in segments:
+        start = segment['start_distance']
+        end = start + segment['length']
+        stations += [start, end, (start + end) / 2]
+    if segments:
+        first = min(segment['start_distance'] for segment in segments)
+        last = max(segment['start_distance'] + segment['length'] for segment in segments)
+        stations += [first - 10.0, last + 10.0]
+    if rng is not None:
+        stations += [rng.uniform(-20.0, 600.0) for _ in range(50)]
+    return stations
+
+
+def profiles():
+    """The hand-made profile, an empty one and a batch of random ones"""
+    rng = random.Random(1)
+    yield SEGMENTS, probe_stations(SEGMENTS)
+    yield [], probe_stations([])
+    for _ in range(100):
+        segments = random_segments(rng, rng.randint(1, 12))
+        yield segments, probe_stations(segments, rng)
+
+
+def sorted_segments(segments):
+    return sorted(segments, key=lambda segment: segment['start_distance'])
+
+
+def test_heights_match_reference():
+    for segments, stations in profiles():
+        ordered = sorted_segments(segments)
+        detector = SlopeChangeDetector([dict(segment) for segment in segments])
+        expected = [reference_height(ordered, station) for station in stations]
+        assert [detector._calculate_height_at_station(station) for station in stations] == expected
+        assert detector.heights_at(stations).tolist() == expected
+
+
+def test_grades_match_reference():
+    for segments, stations in profiles():
+        ordered = sorted_segments(segments)
+        detector = SlopeChangeDetector([dict(segment) for segment in segments])
+        expected = [reference_grade(ordered, station) for station in stations]
+        assert [detector._calculate_grade_at_station(station) for station in stations] == expected
+        assert detector.grades_at(stations).tolist() == expected
+
+
+def test_slope_changes_match_reference():
+    for segments, stations in profiles():
+        ordered = sorted_segments(segments)
+        for threshold in (0.0, 0.01):
+            detector = SlopeChangeDetector([dict(segment) for segment in segments], threshold)
+            changes = detector.detect_slope_changes()
+            assert changes == reference_slope_changes(ordered, threshold)
+            
+            known = [
+                {'station': station, 'from_grade': 0.0, 'to_grade': 0.01,
+                 'height': 1.0, 'type': 'manual'}
+                for station in stations[:6]
+            ]
+            assert (detector.add_known_changes(list(changes), known)
+                    == reference_add_known_changes(list(changes), known))
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_"):
+            check()
+            print(f"{name}: ok")